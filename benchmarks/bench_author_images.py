@@ -0,0 +1,69 @@
+"""Author image conversion throughput, dedupe and worker memory.
+
+Generates camera-sized JPEGs and PNGs, then runs them through AuthorImages
+the way uploads are handled:
+
+    python benchmarks/bench_author_images.py --images 16 --megapixels 12 --workers 2
+"""
+import argparse
+import random
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import hugo_blog_manager as hbm  # noqa: E402
+
+
+def make_photo(path, megapixels, seed):
+    from PIL import Image
+    rng = random.Random(seed)
+    width = int((megapixels * 1e6 * 4 / 3) ** 0.5)
+    height = int(width * 3 / 4)
+    # Smooth gradients plus noise compress like photos rather than flat colour
+    img = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    noise = Image.effect_noise((width // 8, height // 8), 40).resize((width, height)).convert("RGB")
+    img = Image.blend(img, noise, 0.3 + rng.random() * 0.4)
+    img.save(path, quality=90) if path.suffix == ".jpg" else img.save(path)
+    return path.stat().st_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=16)
+    parser.add_argument("--megapixels", type=float, default=12)
+    parser.add_argument("--workers", type=int, default=hbm.IMAGE_WORKERS)
+    parser.add_argument("--concurrency", type=int, default=4, help="uploads handled at once")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        print(f"Generating {args.images} photos of {args.megapixels} MP...")
+        photos = [tmp / f"photo-{i}.{'jpg' if i % 4 else 'png'}" for i in range(args.images)]
+        total = sum(make_photo(path, args.megapixels, i) for i, path in enumerate(photos))
+        images = hbm.AuthorImages(tmp / "cache", workers=args.workers)
+        images.convert(photos[0])  # start the pool outside the timing
+        for warm in images.cache_path.glob("*.webp"):
+            warm.unlink()
+
+        for label, root in (("cold", tmp / "tree-a"), ("cached", tmp / "tree-b")):
+            started = time.perf_counter()
+            with ThreadPoolExecutor(args.concurrency) as pool:
+                fields = list(pool.map(lambda p: images.install(p, root), photos))
+            elapsed = time.perf_counter() - started
+            print(f"{label:<8} {elapsed * 1000:9.1f} ms  {len(photos) / elapsed:7.1f} images/s  "
+                  f"{total / elapsed / 2**20:7.1f} MB/s in")
+        out = sum(f.stat().st_size for f in (tmp / "tree-a" / hbm.AUTHOR_IMAGE_DIR).iterdir())
+        print(f"input {total / 2**20:.1f} MB -> {out / 2**10:.0f} KB of variants for {len(set(fields))} images")
+        images.close()  # children only count towards RUSAGE_CHILDREN once they exit
+        worker_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        print(f"peak worker RSS {worker_rss / 1024:.0f} MB, server RSS "
+              f"{resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Cold build vs incremental update of the SQLite content index.
+
+    python benchmarks/bench_content_index.py --articles 10000 --changes 20
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import hugo_blog_manager as hbm  # noqa: E402
+from synthetic import article_text, git, make_portal  # noqa: E402
+
+
+def timed(label, fn):
+    started = time.perf_counter()
+    result = fn()
+    print(f"{label:<40} {(time.perf_counter() - started) * 1000:9.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articles", type=int, default=10000)
+    parser.add_argument("--authors", type=int, default=300)
+    parser.add_argument("--changes", type=int, default=20, help="articles edited between updates")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "portal"
+        print(f"Generating {args.articles} articles by {args.authors} authors...")
+        authors = make_portal(root, authors=args.authors, articles=args.articles)
+        index = hbm.ContentIndex(root, Path(tmp) / "index.sqlite", min_interval=0)
+
+        count = timed("cold build", lambda: index.update(force=True))
+        print(f"  indexed {count} files")
+        timed("no-op update", lambda: index.update(force=True))
+
+        # Commit some edits, then leave some more uncommitted
+        blog = sorted((root / "content/blog").rglob("index.md"))
+        for path in blog[:args.changes]:
+            path.write_text(article_text(f"Edited {path.parent.name}", authors[:1], "2024-01-01"))
+        git("commit", "-qam", "Edit articles", cwd=root)
+        for path in blog[args.changes:2 * args.changes]:
+            path.write_text(article_text(f"Draft {path.parent.name}", authors[:1], "2024-01-01"))
+        count = timed(f"incremental update ({2 * args.changes} changed)", lambda: index.update(force=True))
+        print(f"  re-read {count} files")
+
+        index.min_interval = 60  # lookups below hit the index only
+        timed("find_slug", lambda: index.find_slug("post-000042"))
+        timed("articles_by_author", lambda: index.articles_by_author(authors[0]))
+        timed("author_counts", lambda: index.author_counts())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Per-handler latency, subprocess and API-call benchmark.
+
+Runs the real handlers against a fake GitHub server and a local bare repo
+acting as the fork's `origin`, on a synthetic portal of configurable size:
+
+    python benchmarks/bench_handlers.py --articles 5000 --iterations 20
+    python benchmarks/bench_handlers.py --save baseline.json
+    python benchmarks/bench_handlers.py --baseline baseline.json --threshold 0.25
+
+With --baseline the run fails (exit status 1) if any tracked metric is
+worse than the baseline by more than --threshold.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fake_github import FakeGithub  # noqa: E402
+from synthetic import ALLOW_FILE_PROTOCOL, make_origin  # noqa: E402
+
+TRACKED = ["p50_ms", "p99_ms", "spawns", "api_calls"]
+LATENCY_SLACK_MS = 2.0  # ignore latency changes smaller than this
+
+
+class Request:
+    """Stand-in for gr.Request; handlers only use the session hash."""
+
+    def __init__(self, session_hash):
+        self.session_hash = session_hash
+
+
+class Recorder:
+    def __init__(self, fake):
+        self.fake = fake
+        self.spawns = 0
+        self.samples = defaultdict(list)  # handler -> [(ms, spawns, api calls, 304s)]
+        self.failures = defaultdict(list)
+        original = subprocess.Popen.__init__
+        recorder = self
+
+        def counting_init(popen, *args, **kwargs):
+            recorder.spawns += 1
+            original(popen, *args, **kwargs)
+
+        subprocess.Popen.__init__ = counting_init
+
+    def run(self, name, fn, *args):
+        self.fake.reset_counts()
+        spawns = self.spawns
+        started = time.perf_counter()
+        result = fn(*args)
+        if hasattr(result, "__next__"):  # generator handlers stream progress
+            for result in result:
+                pass
+        elapsed = (time.perf_counter() - started) * 1000
+        api_calls = sum(self.fake.calls.values())
+        self.samples[name].append((elapsed, self.spawns - spawns, api_calls, self.fake.not_modified))
+        status = result[0] if isinstance(result, tuple) else result
+        if not str(status).startswith("✅"):
+            self.failures[name].append(str(status))
+        return result
+
+    def summary(self):
+        out = {}
+        for name, samples in self.samples.items():
+            ms = sorted(s[0] for s in samples)
+            out[name] = {
+                "runs": len(samples),
+                "p50_ms": statistics.median(ms),
+                "p99_ms": ms[min(len(ms) - 1, round(0.99 * (len(ms) - 1)))],
+                "spawns": statistics.mean(s[1] for s in samples),
+                "api_calls": statistics.mean(s[2] for s in samples),
+                "not_modified": statistics.mean(s[3] for s in samples),
+            }
+        return out
+
+
+def configure(hbm, tmp, origin_url):
+    """Point the manager's paths and shared objects at the temp directory."""
+    clone = tmp / "project" / "developer-portal"
+    hbm.HUGO_PROJECT_PATH = hbm.CLONE_PATH = clone
+    hbm.CONTENT_AUTHORS_PATH = clone / "content/authors"
+    hbm.DATA_AUTHORS_PATH = clone / "data/authors"
+    hbm.CONTENT_BLOG_PATH = clone / "content/blog"
+    hbm.UPSTREAM_URL = origin_url
+    hbm.REFERENCE_CACHE_PATH = tmp / "cache" / "developer-portal.git"
+    hbm.SUBMODULE_CACHE_PATH = tmp / "cache" / "submodules"
+    hbm.WORKTREE_ROOT = tmp / "project" / ".worktrees"
+    hbm.FORK_CACHE_PATH = tmp / "fork_cache.json"
+    hbm.AUTHORS = hbm.AuthorIndex(hbm.CONTENT_AUTHORS_PATH, hbm.DATA_AUTHORS_PATH)
+    hbm.WORKTREES = hbm.WorktreePool(clone, hbm.WORKTREE_ROOT)
+    hbm.CONTENT_INDEX = hbm.ContentIndex(clone, tmp / "content_index.sqlite")
+    hbm.STATE = hbm.StateStore(tmp / ".env", single_user=True)
+    hbm.STATE.settings.update({"GITHUB_PAT": "ghp_" + "b" * 36, "USER_EMAIL": "bench@example.com"})
+
+
+def compare(summary, baseline, threshold):
+    regressions = []
+    for name, metrics in summary.items():
+        for key in TRACKED:
+            if name not in baseline or key not in baseline[name]:
+                continue
+            old, new = baseline[name][key], metrics[key]
+            slack = LATENCY_SLACK_MS if key.endswith("_ms") else 0
+            if new > old * (1 + threshold) + slack:
+                regressions.append(f"{name}.{key}: {old:.1f} -> {new:.1f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--authors", type=int, default=200)
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--submodules", type=int, default=1)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added to every fake GitHub response")
+    parser.add_argument("--save", help="write the results as a baseline JSON file")
+    parser.add_argument("--baseline", help="compare against a baseline JSON file")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative regression")
+    args = parser.parse_args()
+
+    os.environ.update(ALLOW_FILE_PROTOCOL)
+    with tempfile.TemporaryDirectory() as tmp, FakeGithub(latency=args.latency_ms / 1000) as fake:
+        tmp = Path(tmp)
+        print(f"Generating portal: {args.authors} authors, {args.articles} articles, {args.submodules} submodules")
+        origin, authors = make_origin(tmp, authors=args.authors, articles=args.articles, submodules=args.submodules)
+        fake.fork_url = origin.as_uri()
+        os.environ["GITHUB_API_URL"] = fake.url  # read when the module is imported
+
+        import hugo_blog_manager as hbm
+        configure(hbm, tmp, origin.as_uri())
+        pat, email = hbm.STATE.settings["GITHUB_PAT"], hbm.STATE.settings["USER_EMAIL"]
+        rec = Recorder(fake)
+
+        rec.run("fork_repo (first clone)", hbm.fork_repo, pat)
+        for i in range(args.iterations):
+            request = Request(f"bench-{i}")
+            title = f"Benchmark article {i} {time.time_ns()}"
+            rec.run("check_git_credentials", hbm.check_git_credentials, pat, email, 0, request)
+            rec.run("create_article", hbm.create_article, title, authors[i % len(authors)], pat, email, 0, request)
+            rec.run("prepare_preview", hbm.prepare_preview, 0, request)
+            article = Path(hbm.session_state(request).article_folder) / "index.md"
+            article.write_text(article.read_text() + f"\nEdited in iteration {i}.\n")
+            rec.run("commit_changes", hbm.commit_changes, "Edit article", pat, 0, request)
+            rec.run("push_changes", hbm.push_changes, "", pat, "", 0, request)
+            rec.run("create_pr", hbm.create_pr, title, "", pat, 0, request)
+            rec.run("create_pr (already open)", hbm.create_pr, title, "", pat, 0, request)
+            hbm.WORKTREES.release(request.session_hash)
+        for _ in range(max(1, args.iterations // 5)):
+            rec.run("fork_repo (refresh)", hbm.fork_repo, pat)
+        hbm.WORKTREES.cleanup()
+
+    summary = rec.summary()
+    print(f"\n{'handler':<26}{'runs':>5}{'p50 ms':>10}{'p99 ms':>10}{'spawns':>8}{'API':>6}{'304':>6}")
+    for name, m in summary.items():
+        print(f"{name:<26}{m['runs']:>5}{m['p50_ms']:>10.1f}{m['p99_ms']:>10.1f}{m['spawns']:>8.1f}"
+              f"{m['api_calls']:>6.1f}{m['not_modified']:>6.1f}")
+    for name, failures in rec.failures.items():
+        print(f"! {name} failed {len(failures)}x: {failures[0]}")
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(summary, indent=2))
+        print(f"Saved baseline to {args.save}")
+    if args.baseline:
+        regressions = compare(summary, json.loads(Path(args.baseline).read_text()), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions")
+    if rec.failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
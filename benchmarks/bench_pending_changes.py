@@ -0,0 +1,70 @@
+"""Pending changes panel: refresh cost against portal size.
+
+For each portal size, compares a plain full-tree `git status` with the
+watcher's first scan, an idle refresh, and refreshes after a few edits:
+
+    python benchmarks/bench_pending_changes.py --sizes 1000 10000 --edits 3
+
+Exits with status 1 if a refresh misses an edit.
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import hugo_blog_manager as hbm  # noqa: E402
+from synthetic import article_text, git, make_portal  # noqa: E402
+
+
+def timed(fn, settle=0.0):
+    time.sleep(settle)  # let inotify deliver the events of the edits just made
+    started = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - started) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="articles per portal")
+    parser.add_argument("--edits", type=int, default=3)
+    args = parser.parse_args()
+
+    ok = True
+    print(f"{'articles':>8}{'git status':>12}{'first scan':>12}{'idle':>8}{'edits':>8}{'new dir':>9}{'commit':>8}  (ms)")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp) / "portal"
+            authors = make_portal(root, authors=50, articles=size)
+            plain, _ = timed(lambda: git("status", "--porcelain", cwd=root))
+            watcher = hbm.ChangeWatcher(root)
+            first, _ = timed(watcher.changes)
+            idle, _ = timed(watcher.changes)
+
+            blog = sorted((root / "content/blog").rglob("index.md"))
+            for path in blog[:args.edits]:
+                path.write_text(article_text(f"Edited {path.parent.name}", authors[:1], "2024-01-01"))
+            edits, changes = timed(watcher.changes, settle=0.2)
+            ok &= len(changes) == args.edits
+
+            new = root / "content/blog/2025/01/new-article"
+            new.mkdir(parents=True)
+            (new / "index.md").write_text(article_text("New", authors[:1], "2025-01-01"))
+            new_dir, changes = timed(watcher.changes, settle=0.2)
+            ok &= "content/blog/2025/01/new-article/index.md" in changes
+
+            git("add", "-A", cwd=root)
+            git("commit", "-qm", "Edits", cwd=root)
+            commit, changes = timed(watcher.changes, settle=0.2)
+            ok &= not changes
+            watcher.close()
+            print(f"{size:>8}{plain:>12.1f}{first:>12.1f}{idle:>8.2f}{edits:>8.1f}{new_dir:>9.1f}{commit:>8.1f}")
+    if not ok:
+        print("A refresh missed a change")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Instant article preview: render latency cold, cached and after an edit.
+
+Renders articles of a synthetic portal through ArticlePreviews the way the
+preview page and its live-update stream do:
+
+    python benchmarks/bench_preview.py --articles 50 --paragraphs 40
+
+Exits with status 1 if an edit does not show up in the next render.
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import hugo_blog_manager as hbm  # noqa: E402
+from synthetic import article_text, make_portal  # noqa: E402
+
+BODY = """
+## Section {n} of {slug}
+
+Some *emphasis*, a [link](https://example.com) and `code`.
+
+{{{{< figure src="photo-{n}.webp" caption="Figure {n}" >}}}}
+
+{{{{< callout type="note" >}}}}
+A **note** inside a paired shortcode.
+{{{{< /callout >}}}}
+
+| a | b |
+|---|---|
+| {n} | {n} |
+"""
+
+
+def timed(fn, tokens):
+    samples = []
+    for token in tokens:
+        started = time.perf_counter()
+        fn(token)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def report(label, samples):
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"{label:<22}{statistics.median(samples):>10.3f}{p99:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articles", type=int, default=50)
+    parser.add_argument("--paragraphs", type=int, default=40, help="sections per article body")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "portal"
+        authors = make_portal(root, authors=10, articles=args.articles)
+        blog = sorted((root / "content/blog").rglob("index.md"))
+        for path in blog:
+            slug = path.parent.name
+            body = "".join(BODY.format(n=n, slug=slug) for n in range(args.paragraphs))
+            path.write_text(article_text(slug, authors[:1], "2024-01-01") + body)
+        previews = hbm.ArticlePreviews()
+        tokens = [previews.register(path.parent) for path in blog]
+        previews.render(tokens[0])  # import markdown-it outside the timing
+
+        print(f"{'':<22}{'p50 ms':>10}{'p99 ms':>10}")
+        report("cold render", timed(previews.render, tokens))
+        report("unchanged (poll)", timed(previews.render, tokens))
+
+        ok = True
+        edits = []
+        for path, token in zip(blog, tokens):
+            path.write_text(path.read_text() + "\nEdited paragraph.\n")
+            started = time.perf_counter()
+            _, rendered = previews.render(token)
+            edits.append((time.perf_counter() - started) * 1000)
+            ok &= "Edited paragraph." in rendered
+        report("after an edit", edits)
+        for path in blog:  # back to content already in the cache
+            path.write_text(path.read_text().replace("\nEdited paragraph.\n", ""))
+        report("edit reverted (cached)", timed(previews.render, tokens))
+    if not ok:
+        print("An edit did not show up in the preview")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
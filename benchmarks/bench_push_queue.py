@@ -0,0 +1,129 @@
+"""Push queue benchmark: coalescing, no-op detection and retries.
+
+Pushes branches of a clone to a local bare `origin` through `PushQueue`,
+with latency and failures injected into the git runner:
+
+    python benchmarks/bench_push_queue.py --latency-ms 300 --burst 20 --failures 2
+
+Exits with status 1 if a scenario pushes more often than expected or ends
+with the remote branch differing from the local one.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from synthetic import ALLOW_FILE_PROTOCOL, git, make_origin  # noqa: E402
+
+
+class FlakyGit:
+    """`run_git` with added latency on pushes and a number of injected failures."""
+
+    def __init__(self, hbm, latency=0.0):
+        self.hbm = hbm
+        self.latency = latency
+        self.fail = []  # stderr of the next pushes to fail, consumed in order
+        self.pushes = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, *args, **kwargs):
+        if args[0] == "push":
+            with self._lock:
+                self.pushes += 1
+                error = self.fail.pop(0) if self.fail else None
+            time.sleep(self.latency)
+            if error:
+                raise self.hbm.git.GitCommandError(["git", *args], 1, error)
+        return self.hbm.run_git(*args, **kwargs)
+
+
+def commit(clone, branch, n):
+    (clone / f"bench-{branch}-{n}.txt").write_text(f"{n}\n")
+    git("add", "-A", cwd=clone)
+    git("commit", "-q", "-m", f"bench {branch} {n}", cwd=clone)
+
+
+def scenario(name, runner, fn, expect_pushes, check):
+    runner.pushes = 0
+    started = time.perf_counter()
+    ok = fn()
+    elapsed = (time.perf_counter() - started) * 1000
+    passed = ok and runner.pushes <= expect_pushes and check()
+    print(f"{name:<28}{elapsed:>10.1f}{runner.pushes:>8}{expect_pushes:>8}   {'ok' if passed else 'FAIL'}")
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="added to every push")
+    parser.add_argument("--burst", type=int, default=20, help="push requests fired at one branch at once")
+    parser.add_argument("--failures", type=int, default=2, help="transient failures before a push succeeds")
+    args = parser.parse_args()
+
+    os.environ.update(ALLOW_FILE_PROTOCOL)
+    import hugo_blog_manager as hbm
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        origin, _ = make_origin(tmp, authors=5, articles=20)
+        clone = tmp / "clone"
+        git("clone", "-q", origin.as_uri(), str(clone), cwd=tmp)
+        git("config", "user.email", "bench@example.com", cwd=clone)
+        git("config", "user.name", "bench", cwd=clone)
+        git("checkout", "-q", "-b", "article/bench", cwd=clone)
+
+        runner = FlakyGit(hbm, args.latency_ms / 1000)
+        pushes = hbm.PushQueue(backoff=0.05, runner=runner)
+        log = hbm.SessionLog()
+
+        def in_sync():
+            local = git("rev-parse", "refs/heads/article/bench", cwd=clone)
+            return git("rev-parse", "refs/heads/article/bench", cwd=origin) == local
+
+        def burst():
+            commit(clone, "bench", 0)
+            tickets = [pushes.request(clone, "article/bench", log=log) for _ in range(args.burst)]
+            return all(t.wait(60) and t.ok for t in tickets)
+
+        def burst_while_pushing():
+            commit(clone, "bench", 1)
+            first = pushes.request(clone, "article/bench", log=log)
+            time.sleep(args.latency_ms / 2000)  # the first push is now in flight
+            commit(clone, "bench", 2)
+            tickets = [pushes.request(clone, "article/bench", log=log) for _ in range(args.burst)]
+            return first.wait(60) and all(t.wait(60) and t.ok for t in tickets)
+
+        def noop():
+            ticket = pushes.request(clone, "article/bench", log=log)
+            return ticket.wait(60) and ticket.ok
+
+        def transient():
+            commit(clone, "bench", 3)
+            runner.fail = ["fatal: unable to access remote: Connection timed out"] * args.failures
+            ticket = pushes.request(clone, "article/bench", log=log)
+            return ticket.wait(60) and ticket.ok
+
+        def rejected():
+            commit(clone, "bench", 4)
+            runner.fail = [" ! [rejected]        article/bench (non-fast-forward)"] * 3
+            ticket = pushes.request(clone, "article/bench", log=log)
+            return ticket.wait(60) and not ticket.ok
+
+        print(f"{'scenario':<28}{'ms':>10}{'pushes':>8}{'max':>8}")
+        results = [
+            scenario(f"burst of {args.burst}", runner, burst, 1, in_sync),
+            scenario(f"burst of {args.burst} during push", runner, burst_while_pushing, 2, in_sync),
+            scenario("no-op push", runner, noop, 0, in_sync),
+            scenario(f"{args.failures} transient failures", runner, transient, args.failures + 1, in_sync),
+            scenario("rejected push", runner, rejected, 1, lambda: not in_sync()),
+        ]
+    if not all(results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
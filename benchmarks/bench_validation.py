@@ -0,0 +1,76 @@
+"""Pre-commit validation: full sweeps, cached sweeps and branch-only checks.
+
+    python benchmarks/bench_validation.py --articles 10000 --changes 20
+
+Exits with status 1 if the injected problems (broken YAML, an unknown
+author, a duplicate slug) are not all reported.
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import hugo_blog_manager as hbm  # noqa: E402
+from synthetic import article_text, git, make_portal  # noqa: E402
+
+
+def timed(label, fn):
+    started = time.perf_counter()
+    result = fn()
+    print(f"{label:<40} {(time.perf_counter() - started) * 1000:9.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articles", type=int, default=10000)
+    parser.add_argument("--authors", type=int, default=300)
+    parser.add_argument("--changes", type=int, default=20, help="articles edited on the branch")
+    parser.add_argument("--workers", type=int, default=hbm.VALIDATION_WORKERS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "portal"
+        print(f"Generating {args.articles} articles by {args.authors} authors...")
+        authors = make_portal(root, authors=args.authors, articles=args.articles)
+        hbm.AUTHORS = hbm.AuthorIndex(root / "content/authors", root / "data/authors")
+        hbm.CONTENT_INDEX = hbm.ContentIndex(root, Path(tmp) / "index.sqlite")
+        hbm.CONTENT_INDEX.update(force=True)
+        validator = hbm.Validator(workers=args.workers)
+
+        problems = timed(f"full sweep, cold ({args.workers} workers)", lambda: validator.validate(root, full=True))
+        print(f"  {validator.misses} files parsed, {len(problems)} problems")
+        timed("full sweep, cached", lambda: validator.validate(root, full=True))
+
+        git("checkout", "-q", "-b", "article/bench", cwd=root)
+        blog = sorted((root / "content/blog").rglob("index.md"))
+        for path in blog[:args.changes]:
+            path.write_text(article_text(f"Edited {path.parent.name}", authors[:1], "2024-01-01"))
+        git("commit", "-qam", "Edit articles", cwd=root)
+        timed(f"branch check ({args.changes} changed)", lambda: validator.validate(root))
+
+        broken = root / "content/blog/2025/01/broken-yaml/index.md"
+        broken.parent.mkdir(parents=True)
+        broken.write_text('---\ntitle: "Broken\nauthors: [\n---\n')
+        ghost = root / "content/blog/2025/01/ghost-author/index.md"
+        ghost.parent.mkdir(parents=True)
+        ghost.write_text(article_text("Ghost", ["no-such-author"], "2025-01-01"))
+        dupe = root / "content/blog/2025/02" / blog[-1].parent.name / "index.md"
+        dupe.parent.mkdir(parents=True)
+        dupe.write_text(article_text("Duplicate", authors[:1], "2025-02-01"))
+        problems = timed("branch check with 3 bad files", lambda: validator.validate(root))
+        for problem in problems:
+            print(f"  {problem}")
+
+    expected = ["broken-yaml", "no-such-author", "is also used by"]
+    missing = [e for e in expected if not any(e in p for p in problems)]
+    if missing:
+        print(f"Not reported: {missing}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
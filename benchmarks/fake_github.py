@@ -0,0 +1,143 @@
+"""A small fake of the GitHub REST/GraphQL API for local benchmarks.
+
+Serves the endpoints the manager uses with ETags and rate-limit headers,
+counts every request by route, and can add latency to each response.
+"""
+import json
+import re
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeGithub:
+    def __init__(self, login="bench-user", upstream="espressif/developer-portal", fork_url="", latency=0.0):
+        self.login = login
+        self.upstream = upstream
+        self.fork_name = f"{login}/{upstream.split('/')[1]}"
+        self.fork_url = fork_url
+        self.latency = latency
+        self.calls = Counter()  # route -> requests
+        self.not_modified = 0
+        self.rate_limit = 5000
+        self.pulls = []
+        self._lock = threading.Lock()
+        self._server = None
+
+    # --- Routes ---
+    def _repo(self, full_name):
+        if full_name.lower() == self.fork_name.lower():
+            return {"full_name": self.fork_name, "name": self.fork_name.split("/")[1], "fork": True,
+                    "ssh_url": self.fork_url, "clone_url": self.fork_url,
+                    "parent": {"full_name": self.upstream}, "source": {"full_name": self.upstream}}
+        if full_name.lower() == self.upstream.lower() or full_name.split("/")[0] != self.login:
+            return {"full_name": full_name, "name": full_name.split("/")[1], "fork": False,
+                    "default_branch": "main", "ssh_url": self.fork_url, "clone_url": self.fork_url}
+        return None
+
+    def route(self, method, path, query, body):
+        """Return (route name, status, payload) for a request."""
+        if method == "GET" and path == "/user":
+            return "user", 200, {"login": self.login, "email": None}
+        m = re.fullmatch(r"/repos/([^/]+/[^/]+)/collaborators/([^/]+)/permission", path)
+        if method == "GET" and m:
+            return "permission", 200, {"permission": "write"}
+        m = re.fullmatch(r"/repos/([^/]+/[^/]+)/pulls", path)
+        if m and method == "GET":
+            head = query.get("head", "")
+            return "list_pulls", 200, [p for p in self.pulls if not head or p["head"]["label"] == head]
+        if m and method == "POST":
+            label = f"{self.login}:{body.get('head', '').split(':')[-1]}"
+            if any(p["head"]["label"] == label for p in self.pulls):
+                return "create_pull", 422, {"message": f"A pull request already exists for {label}."}
+            number = len(self.pulls) + 1
+            pull = {"number": number, "title": body.get("title"), "body": body.get("body"),
+                    "head": {"label": label},
+                    "html_url": f"https://github.com/{m.group(1)}/pull/{number}"}
+            self.pulls.append(pull)
+            return "create_pull", 201, pull
+        m = re.fullmatch(r"/repos/([^/]+/[^/]+)/forks", path)
+        if m and method == "POST":
+            return "create_fork", 202, self._repo(self.fork_name)
+        m = re.fullmatch(r"/repos/([^/]+/[^/]+)", path)
+        if m and method == "GET":
+            repo = self._repo(m.group(1))
+            return ("repo", 200, repo) if repo else ("repo", 404, {"message": "Not Found"})
+        if method == "POST" and path == "/graphql":
+            nodes = [{"nameWithOwner": self.fork_name, "sshUrl": self.fork_url}]
+            return "graphql", 200, {"data": {"repository": {"forks": {"nodes": nodes}}}}
+        return "unknown", 404, {"message": "Not Found"}
+
+    # --- Server ---
+    def start(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _handle(self, method):
+                import time
+                from urllib.parse import parse_qsl, urlsplit
+                if fake.latency:
+                    time.sleep(fake.latency)
+                url = urlsplit(self.path)
+                path = url.path[len("/api/v3"):] if url.path.startswith("/api/v3") else url.path
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+                name, status, payload = fake.route(method, path, dict(parse_qsl(url.query)), body)
+                data = json.dumps(payload).encode()
+                etag = f'"{hash(data) & 0xffffffff:x}"'
+                with fake._lock:
+                    fake.calls[name] += 1
+                    not_modified = method == "GET" and self.headers.get("If-None-Match") == etag
+                    if not_modified:
+                        fake.not_modified += 1  # 304s don't count against the rate limit
+                    else:
+                        fake.rate_limit -= 1
+                    remaining = fake.rate_limit
+                if not_modified:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("ETag", etag)
+                self.send_header("X-RateLimit-Remaining", str(remaining))
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.url
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_counts(self):
+        with self._lock:
+            self.calls.clear()
+            self.not_modified = 0
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
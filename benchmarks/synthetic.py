@@ -0,0 +1,79 @@
+"""Synthetic developer-portal trees for benchmarks."""
+import json
+import random
+import subprocess
+from pathlib import Path
+
+
+def git(*args, cwd):
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout
+
+
+def article_text(title, authors, date):
+    authors_yaml = "".join(f'\n  - "{a}"' for a in authors)
+    return f'---\ntitle: "{title}"\ndate: "{date}"\nsummary: "Synthetic article."\nauthors:{authors_yaml}\ntags: ["ESP-IDF"]\n---\n\nBody of {title}.\n'
+
+
+# Local file:// submodules are blocked by default since git 2.38
+ALLOW_FILE_PROTOCOL = {"GIT_CONFIG_COUNT": "1", "GIT_CONFIG_KEY_0": "protocol.file.allow",
+                       "GIT_CONFIG_VALUE_0": "always"}
+
+
+def make_submodule(path, files=50):
+    """A small bare repo standing in for a theme submodule; returns its URL."""
+    work = Path(str(path) + "-work")
+    (work / "layouts").mkdir(parents=True)
+    for i in range(files):
+        (work / "layouts" / f"partial-{i}.html").write_text(f"<div>{i}</div>\n")
+    git("init", "-q", "-b", "main", cwd=work)
+    git("add", "-A", cwd=work)
+    git("-c", "user.name=bench", "-c", "user.email=bench@example.com", "commit", "-q", "-m", "theme", cwd=work)
+    git("clone", "-q", "--bare", str(work), str(path), cwd=work.parent)
+    return Path(path).resolve().as_uri()
+
+
+def make_portal(root, authors=100, articles=1000, submodules=0, seed=0):
+    """Create a git repo at `root` laid out like the developer portal.
+
+    Returns the list of author names. Articles are spread over
+    content/blog/<year>/<month>/ and each has one or two authors. Each
+    submodule is a separate bare repo next to `root`, mounted under themes/.
+    Set ALLOW_FILE_PROTOCOL in the environment before cloning recursively.
+    """
+    rng = random.Random(seed)
+    root = Path(root)
+    names = [f"author-{i:05d}" for i in range(authors)]
+    for name in names:
+        (root / "content/authors" / name).mkdir(parents=True, exist_ok=True)
+        (root / "content/authors" / name / "_index.md").write_text(f"---\ntitle: {name}\n---\n")
+        (root / "data/authors").mkdir(parents=True, exist_ok=True)
+        (root / "data/authors" / f"{name}.json").write_text(json.dumps({"name": name, "bio": "", "image": ""}))
+    for i in range(articles):
+        year, month = 2015 + i % 11, 1 + (i // 11) % 12
+        article_dir = root / f"content/blog/{year}/{month:02d}/post-{i:06d}"
+        article_dir.mkdir(parents=True, exist_ok=True)
+        by = rng.sample(names, k=min(len(names), rng.choice([1, 2])))
+        (article_dir / "index.md").write_text(article_text(f"Post {i}", by, f"{year}-{month:02d}-01"))
+    (root / "hugo.toml").write_text('baseURL = "https://developer.espressif.com/"\n')
+    git("init", "-q", "-b", "main", cwd=root)
+    git("config", "user.email", "bench@example.com", cwd=root)
+    git("config", "user.name", "bench", cwd=root)
+    git("add", "-A", cwd=root)
+    for i in range(submodules):
+        url = make_submodule(root.parent / f"theme-{i}.git")
+        git("-c", "protocol.file.allow=always", "submodule", "add", "-q", url, f"themes/theme-{i}", cwd=root)
+    git("commit", "-q", "-m", "Synthetic portal", cwd=root)
+    return names
+
+
+def make_origin(root, **kwargs):
+    """A synthetic portal plus a bare clone of it to act as `origin`.
+
+    Returns (bare repo path, author names).
+    """
+    root = Path(root)
+    names = make_portal(root / "portal-src", **kwargs)
+    origin = root / "origin.git"
+    git("clone", "-q", "--bare", str(root / "portal-src"), str(origin), cwd=root)
+    git("config", "uploadpack.allowFilter", "true", cwd=origin)
+    return origin, names
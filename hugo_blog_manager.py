@@ -1,12 +1,62 @@
+from __future__ import annotations
+
 import os
+import bisect
+import contextvars
+import csv
+import difflib
+import functools
+import hashlib
+import html
+import importlib
+import queue
+import re
+import select
+import shutil
+import sqlite3
+import struct
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
 from datetime import datetime
-import gradio as gr
-from github import Github, Auth, GithubException
-from git import Repo, Actor
 import json
-from slugify import slugify
-from dotenv import load_dotenv, set_key
+
+_IMPORT_STARTED = time.perf_counter()
+
+
+class _LazyModule:
+    """Stand-in for a module that is imported on first attribute access.
+
+    Keeps `import hugo_blog_manager` cheap and side-effect free; gradio,
+    PyGithub, GitPython and requests are only loaded once something uses them.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+gr = _LazyModule("gradio")
+github = _LazyModule("github")
+git = _LazyModule("git")
+requests = _LazyModule("requests")
+
+def slugify(text, **kwargs):
+    from slugify import slugify as _slugify
+    return _slugify(text, **kwargs)
 
 # --- Configuration ---
 HUGO_PROJECT_PATH = Path("/project/developer-portal-fork-test")
@@ -16,18 +66,2043 @@ CONTENT_BLOG_PATH = HUGO_PROJECT_PATH / "content/blog"
 CLONE_PATH = HUGO_PROJECT_PATH
 CODE_SERVER_BASE = "http://localhost:8087/"
 REPO_FULL_NAME = "espressif/developer-portal"
+AUTHOR_DROPDOWN_LIMIT = 50  # max choices sent to the browser per dropdown update
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")  # point at a fake server for testing
+GITHUB_CLIENT_POOL_SIZE = 16  # max number of PATs with a live client
+GITHUB_ETAG_CACHE_SIZE = 256  # cached GET responses per client
+FORK_CACHE_PATH = Path(".fork_cache.json")  # persisted owner -> fork lookups
+FORK_CACHE_TTL = 24 * 3600  # seconds before a cached fork is looked up again
+UPSTREAM_URL = f"https://github.com/{REPO_FULL_NAME}.git"
+REFERENCE_CACHE_PATH = Path("/project/.git-cache/developer-portal.git")  # shared by all clones
+FAST_CLONE = True  # blobless clone + sparse checkout + reference cache
+CLONE_FILTER = "blob:none"
+# Cone-mode sparse checkout: what writing articles and running Hugo needs
+SPARSE_CHECKOUT_DIRS = ["archetypes", "assets", "config", "content", "data", "i18n", "layouts", "static", "themes"]
+SUBMODULE_CACHE_PATH = Path("/project/.git-cache/submodules")  # one bare mirror per submodule URL, shared
+SUBMODULE_CACHE_MAX_AGE = 30 * 24 * 3600  # seconds a mirror no checkout uses is kept
+SUBMODULE_GC_INTERVAL = 6 * 3600  # seconds between cache garbage collections
+WORKTREE_ROOT = Path("/project/.worktrees")  # under /project so code-server can open them
+WORKTREE_POOL_SIZE = 2  # idle worktrees kept pre-warmed
+WORKTREE_MAX = 16  # hard cap on worktrees, leased or idle
+WORKTREE_IDLE_SECONDS = 30 * 60  # leases unused and without file changes for this long are released
+WORKTREE_PARKED_SECONDS = 24 * 3600  # parked worktrees are snapshotted to refs/parked/* and removed after this
+ENV_PATH = Path(".env")
+ENV_KEYS = ["GITHUB_PAT", "USER_EMAIL"]  # settings persisted to .env
+# Only for a personal instance: sessions start with the PAT and email from .env, and Check Git saves them there.
+# Otherwise each browser session keeps its own credentials in memory and .env is never shared between users.
+SINGLE_USER = os.getenv("SINGLE_USER", "").lower() in ("1", "true", "yes")
+ENV_FLUSH_DELAY = 0.5  # seconds to coalesce setting changes into one .env write
+JOB_CONCURRENCY = {"network": 4, "disk": 2}  # worker threads per kind of job
+UI_CONCURRENCY = 32  # Gradio events handled at once; handlers mostly wait on jobs
+LOG_BUFFER_LINES = 500  # per-session log lines kept in memory and in the browser
+LOG_LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+CONTENT_INDEX_PATH = Path(".content_index.sqlite")  # front matter index of content/blog
+CONTENT_INDEX_MIN_INTERVAL = 2.0  # seconds between incremental index updates on lookups
+BULK_RENDER_WORKERS = 8  # threads rendering and writing manifest files
+DEFAULT_SUMMARY = "This article explains many useful things."
+DEFAULT_TAGS = ["ESP-IDF"]
+PUSH_WORKERS = 2  # branches pushed at once
+PUSH_RETRIES = 5  # attempts after the first one before a push is given up
+PUSH_BACKOFF = 1.0  # seconds before the first retry, doubled on every further one
+PUSH_BACKOFF_MAX = 60.0
+PUSH_WAIT_SECONDS = 15  # the Push button waits this long before leaving the push to the background
+PUSH_PERMANENT_ERRORS = ("[rejected]", "non-fast-forward", "Permission denied", "Authentication failed",
+                         "Repository not found", "does not appear to be a git repository")
+VALIDATION_WORKERS = os.cpu_count() or 1  # processes parsing front matter on large changes
+VALIDATION_PARALLEL_MIN = 256  # files to parse before the work moves to the process pool
+VALIDATION_CACHE_SIZE = 100_000  # parse results kept, keyed by blob SHA
+AUTHOR_IMAGE_DIR = "assets/img/authors"  # in the repo; the `image` field is relative to assets/
+AUTHOR_IMAGE_SIZES = (128, 256, 512)  # square WebP variants generated per upload, in pixels
+AUTHOR_IMAGE_FIELD_SIZE = 256  # variant referenced from data/authors/<name>.json
+AUTHOR_IMAGE_QUALITY = 80
+AUTHOR_IMAGE_MAX_BYTES = 25 * 2**20  # larger uploads are refused
+AUTHOR_IMAGE_MAX_PIXELS = 60_000_000  # decompression bomb guard
+IMAGE_WORKERS = 2  # processes converting uploads
+IMAGE_CACHE_PATH = Path("/project/.image-cache")  # converted variants shared by all worktrees
+PENDING_CHANGES_PATHS = ["content", "data"]  # what the pending changes panel watches
+PENDING_CHANGES_POLL = 2.0  # seconds between panel refreshes in the browser
+PENDING_CHANGES_LIMIT = 200  # files listed in the panel
+PENDING_DIFF_MAX_BYTES = 200_000  # longer diffs are cut
+PENDING_PATHSPECS_MAX = 500  # edited paths re-checked one by one; more trigger a full scoped status
+PREVIEW_CACHE_SIZE = 256  # rendered articles kept, keyed by content hash
+PREVIEW_SECTION_CACHE_SIZE = 4096  # rendered sections (text between headings) kept, keyed by content hash
+PREVIEW_POLL_SECONDS = 0.1  # how often an open preview checks its index.md for changes
+PREVIEW_BUILD_ROOT = Path("/project/.previews")  # full Hugo builds, one per working tree, outside the trees
+HUGO_BIN = "hugo"
+PR_PUSH_TIMEOUT = 120  # seconds Create Pull Request waits for the branch push
+SLOW_TRACE_MS = 2000  # handler runs slower than this get their span trace dumped
+TRACE_ALL = False  # dump the span trace of every handler run, not just slow ones
+TRACE_DUMP_PATH = Path(".traces.jsonl")
+HISTOGRAM_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)  # seconds
+SECRET_RE = re.compile(r"\b(gh[pousr]_[A-Za-z0-9]{20,}|github_pat_[A-Za-z0-9_]{20,})\b")
+
+
+# --- Metrics ---
+class Metrics:
+    """Minimal Prometheus-style registry of counters, histograms and gauges."""
+
+    def __init__(self):
+        self._counters = {}  # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+        self._gauges = {}  # name -> callable returning {labels: value}
+        self._help = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, amount=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, seconds, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            hist = self._histograms.setdefault(key, [0] * (len(HISTOGRAM_BUCKETS) + 2))
+            for i, bound in enumerate(HISTOGRAM_BUCKETS):
+                if seconds <= bound:
+                    hist[i] += 1
+            hist[-2] += seconds
+            hist[-1] += 1
+
+    def gauge(self, name, fn, help_text=""):
+        """Register `fn() -> {labels tuple: value}`, evaluated at scrape time."""
+        self._gauges[name] = fn
+        self._help[name] = help_text
+
+    @staticmethod
+    def _labels(labels, extra=()):
+        pairs = list(labels) + list(extra)
+        return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}" if pairs else ""
+
+    def render(self):
+        """The registry in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items())
+        for name in sorted({k[0] for k, _ in counters}):
+            lines.append(f"# TYPE {name} counter")
+            lines += [f"{n}{self._labels(l)} {v}" for (n, l), v in counters if n == name]
+        for name in sorted({k[0] for k, _ in histograms}):
+            lines.append(f"# TYPE {name} histogram")
+            for (n, labels), hist in histograms:
+                if n != name:
+                    continue
+                for bound, count in zip(HISTOGRAM_BUCKETS, hist):
+                    lines.append(f"{n}_bucket{self._labels(labels, [('le', bound)])} {count}")
+                lines.append(f"{n}_bucket{self._labels(labels, [('le', '+Inf')])} {hist[-1]}")
+                lines.append(f"{n}_sum{self._labels(labels)} {hist[-2]:.6f}")
+                lines.append(f"{n}_count{self._labels(labels)} {hist[-1]}")
+        for name, fn in sorted(self._gauges.items()):
+            if self._help[name]:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in fn().items():
+                lines.append(f"{name}{self._labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+_current_handler = contextvars.ContextVar("handler", default="none")
+_current_trace = contextvars.ContextVar("trace", default=None)
+_slow_traces = deque(maxlen=50)
+
+@contextmanager
+def span(name):
+    """Time a step of the current handler; `git ...` spans count as subprocesses."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        handler = _current_handler.get()
+        METRICS.observe("step_duration_seconds", elapsed, handler=handler, step=name.split(" /")[0])
+        if name.startswith("git "):
+            METRICS.inc("git_subprocesses_total", handler=handler)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace["spans"].append({"step": name, "start_ms": round((started - trace["t0"]) * 1000, 2),
+                                   "ms": round(elapsed * 1000, 2)})
+
+@contextmanager
+def handler_trace(handler):
+    """Time a whole handler run and dump its spans if it was slow."""
+    trace = {"handler": handler, "t0": time.perf_counter(), "spans": []}
+    handler_token = _current_handler.set(handler)
+    trace_token = _current_trace.set(trace)
+    status = "ok"
+    try:
+        yield
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        _current_trace.reset(trace_token)
+        _current_handler.reset(handler_token)
+        elapsed = time.perf_counter() - trace["t0"]
+        METRICS.observe("handler_duration_seconds", elapsed, handler=handler)
+        METRICS.inc("handler_runs_total", handler=handler, status=status)
+        if TRACE_ALL or elapsed * 1000 > SLOW_TRACE_MS:
+            record = {"handler": handler, "at": datetime.now().isoformat(timespec="seconds"),
+                      "ms": round(elapsed * 1000, 1), "status": status, "spans": trace["spans"]}
+            _slow_traces.append(record)
+            with open(TRACE_DUMP_PATH, "a") as f:
+                f.write(json.dumps(record) + "\n")
+
+def traced(handler):
+    """Run a plain (non-job, non-generator) Gradio handler under `handler_trace`."""
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        with handler_trace(handler.__name__):
+            return handler(*args, **kwargs)
+    return wrapper
+
+
+# --- Author Index ---
+class AuthorIndex:
+    """In-memory index of the authors in content/authors/* and data/authors/*.json.
+
+    Each source directory is rescanned only when its mtime changes (an entry was
+    added, removed or renamed), so a lookup normally costs two stat() calls.
+    """
+
+    def __init__(self, content_path, data_path):
+        self.content_path = Path(content_path)
+        self.data_path = Path(data_path)
+        self.generation = 0  # bumped whenever the author set changes
+        self._lock = threading.Lock()
+        self._mtimes = {"content": None, "data": None}
+        self._content = set()
+        self._data = set()
+        self._names = []
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _scan_content(self):
+        with os.scandir(self.content_path) as entries:
+            return {e.name for e in entries if e.is_dir()}
+
+    def _scan_data(self):
+        with os.scandir(self.data_path) as entries:
+            return {e.name[:-5] for e in entries if e.name.endswith(".json") and e.is_file()}
+
+    def refresh(self):
+        """Rescan the directories whose mtime changed since the last call."""
+        with self._lock:
+            changed = False
+            for key, path, scan in (("content", self.content_path, self._scan_content),
+                                    ("data", self.data_path, self._scan_data)):
+                mtime = self._mtime(path)
+                if mtime == self._mtimes[key]:
+                    continue
+                self._mtimes[key] = mtime
+                names = scan() if mtime is not None else set()
+                if names != getattr(self, f"_{key}"):
+                    setattr(self, f"_{key}", names)
+                    changed = True
+            if changed:
+                self._names = sorted(self._content | self._data)
+                self.generation += 1
+            return self._names
+
+    def names(self):
+        return self.refresh()
+
+    def data_names(self):
+        """Authors with a data/authors/<name>.json file."""
+        self.refresh()
+        return self._data
+
+    def has_data(self, name):
+        """True if the author has a data/authors/<name>.json file."""
+        self.refresh()
+        return name in self._data
+
+    def __contains__(self, name):
+        return name in self.refresh()
+
+    def __len__(self):
+        return len(self.refresh())
+
+    def search(self, query, limit=AUTHOR_DROPDOWN_LIMIT):
+        """Prefix matches first, then substring matches, then fuzzy matches."""
+        names = self.refresh()
+        q = format_author_name(query or "")
+        if not q:
+            return names[:limit]
+        start = bisect.bisect_left(names, q)
+        results = []
+        for name in names[start:]:
+            if not name.startswith(q) or len(results) >= limit:
+                break
+            results.append(name)
+        if len(results) < limit:
+            seen = set(results)
+            results += [n for n in names if q in n and n not in seen][:limit - len(results)]
+        if len(results) < limit:
+            seen = set(results)
+            fuzzy = difflib.get_close_matches(q, names, n=limit, cutoff=0.6)
+            results += [n for n in fuzzy if n not in seen][:limit - len(results)]
+        return results
+
+AUTHORS = AuthorIndex(CONTENT_AUTHORS_PATH, DATA_AUTHORS_PATH)
+
+_author_indexes = OrderedDict()  # working tree -> AuthorIndex, least recently used first
+_author_indexes_lock = threading.Lock()
+
+def author_index(root):
+    """AuthorIndex of a working tree; authors created in a worktree only exist there until merged."""
+    content_path, data_path = Path(root) / "content/authors", Path(root) / "data/authors"
+    if content_path == AUTHORS.content_path:
+        return AUTHORS
+    with _author_indexes_lock:
+        index = _author_indexes.get(str(root))
+        if index is None:
+            index = _author_indexes[str(root)] = AuthorIndex(content_path, data_path)
+            while len(_author_indexes) > WORKTREE_MAX + 1:
+                _author_indexes.popitem(last=False)
+        _author_indexes.move_to_end(str(root))
+        return index
+
+# --- GitHub Client Pool ---
+class GithubClient:
+    """A PyGithub client and a keep-alive HTTP session bound to one PAT.
+
+    Read-only lookups (user, repo, permission) go through `get_json`, which sends
+    `If-None-Match` with the last ETag seen. GitHub answers unchanged resources
+    with 304, which does not count against the rate limit.
+    """
+
+    def __init__(self, pat, base_url=GITHUB_API_URL):
+        self.base_url = base_url.rstrip("/")
+        self.github = github.Github(auth=github.Auth.Token(pat), base_url=self.base_url)
+        self.session = requests.Session()
+        self.session.mount(self.base_url, requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=8))
+        self.session.headers.update({
+            "Authorization": f"Bearer {pat}",
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+        })
+        self.hits = 0
+        self.misses = 0
+        self.rate_limit_remaining = None
+        self._cache = OrderedDict()  # url -> (etag, json)
+        self._lock = threading.Lock()
+
+    def get_json(self, path, params=None):
+        url = f"{self.base_url}{path}"
+        if params:
+            url += "?" + "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+        headers = {}
+        with self._lock:
+            cached = self._cache.get(url)
+        if cached:
+            headers["If-None-Match"] = cached[0]
+        with span(f"github GET {path}"):
+            resp = self.session.get(url, headers=headers, timeout=30)
+        METRICS.inc("github_api_calls_total", handler=_current_handler.get(), status=resp.status_code)
+        remaining = resp.headers.get("X-RateLimit-Remaining")
+        with self._lock:
+            if remaining is not None:
+                self.rate_limit_remaining = int(remaining)
+            if resp.status_code == 304 and cached:
+                self.hits += 1
+                self._cache.move_to_end(url)
+                return cached[1]
+            self.misses += 1
+            if resp.status_code >= 400:
+                raise github.GithubException(resp.status_code, resp.json() if resp.content else None, dict(resp.headers))
+            data = resp.json()
+            if resp.headers.get("ETag"):
+                self._cache[url] = (resp.headers["ETag"], data)
+                self._cache.move_to_end(url)
+                while len(self._cache) > GITHUB_ETAG_CACHE_SIZE:
+                    self._cache.popitem(last=False)
+            return data
+
+    def post_json(self, path, payload):
+        with span(f"github POST {path}"):
+            resp = self.session.post(f"{self.base_url}{path}", json=payload, timeout=30)
+        METRICS.inc("github_api_calls_total", handler=_current_handler.get(), status=resp.status_code)
+        with self._lock:
+            self.misses += 1
+        if resp.status_code >= 400:
+            raise github.GithubException(resp.status_code, resp.json() if resp.content else None, dict(resp.headers))
+        return resp.json()
+
+    def user(self):
+        return self.get_json("/user")
+
+    def repo(self, full_name):
+        return self.get_json(f"/repos/{full_name}")
+
+    def permission(self, full_name, login):
+        return self.get_json(f"/repos/{full_name}/collaborators/{login}/permission")["permission"]
+
+    def open_pull(self, full_name, head):
+        """The open pull request from `head` ("login:branch") into `full_name`, or None."""
+        pulls = self.get_json(f"/repos/{full_name}/pulls", {"head": head, "state": "open"})
+        return pulls[0] if pulls else None
+
+    def create_pull(self, full_name, title, head, base, body=""):
+        return self.post_json(f"/repos/{full_name}/pulls", {"title": title, "head": head, "base": base, "body": body})
+
+    def graphql(self, query, variables=None):
+        # GitHub Enterprise serves GraphQL at /api/graphql next to /api/v3
+        if self.base_url.endswith("/api/v3"):
+            url = self.base_url[:-len("/v3")] + "/graphql"
+        else:
+            url = f"{self.base_url}/graphql"
+        with span("github POST /graphql"):
+            resp = self.session.post(url, json={"query": query, "variables": variables or {}}, timeout=30)
+        METRICS.inc("github_api_calls_total", handler=_current_handler.get(), status=resp.status_code)
+        with self._lock:
+            self.misses += 1
+        if resp.status_code >= 400:
+            raise github.GithubException(resp.status_code, resp.json() if resp.content else None, dict(resp.headers))
+        data = resp.json()
+        if data.get("errors"):
+            raise github.GithubException(resp.status_code, data, dict(resp.headers))
+        return data["data"]
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "rate_limit_remaining": self.rate_limit_remaining}
+
+    def close(self):
+        self.session.close()
+        self.github.close()
+
+
+_github_clients = OrderedDict()  # sha256(pat) -> GithubClient, least recently used first
+_github_clients_lock = threading.Lock()
+
+def get_github_client(pat):
+    """Return the shared client for `pat`, creating it if needed."""
+    key = hashlib.sha256(pat.encode()).hexdigest()
+    with _github_clients_lock:
+        client = _github_clients.get(key)
+        if client is None:
+            client = _github_clients[key] = GithubClient(pat)
+            while len(_github_clients) > GITHUB_CLIENT_POOL_SIZE:
+                _, evicted = _github_clients.popitem(last=False)
+                evicted.close()
+        _github_clients.move_to_end(key)
+        return client
+
+
+# --- Fork Resolver ---
+_fork_cache_lock = threading.Lock()
+
+FORKS_BY_OWNER_QUERY = """
+query($owner: String!, $name: String!) {
+  repository(owner: $owner, name: $name) {
+    forks(first: 1, ownerAffiliations: [OWNER]) {
+      nodes { nameWithOwner sshUrl }
+    }
+  }
+}
+"""
+
+def _load_fork_cache():
+    try:
+        return json.loads(FORK_CACHE_PATH.read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def remember_fork(login, full_name, ssh_url):
+    with _fork_cache_lock:
+        cache = _load_fork_cache()
+        cache[f"{login}:{REPO_FULL_NAME}".lower()] = {"full_name": full_name, "ssh_url": ssh_url, "at": time.time()}
+        tmp = FORK_CACHE_PATH.with_suffix(".tmp")
+        tmp.write_text(json.dumps(cache, indent=2))
+        os.replace(tmp, FORK_CACHE_PATH)
+
+def resolve_fork(client, login, names):
+    """Find `login`'s fork of REPO_FULL_NAME, or None.
+
+    Tries the persistent cache, then a direct `login/<name>` lookup for each of
+    `names`, then asks the upstream for forks owned by the viewer. None of these
+    depend on how many repositories the user can see.
+    """
+    key = f"{login}:{REPO_FULL_NAME}".lower()
+    with _fork_cache_lock:
+        entry = _load_fork_cache().get(key)
+    if entry and time.time() - entry["at"] < FORK_CACHE_TTL:
+        return {"full_name": entry["full_name"], "ssh_url": entry["ssh_url"]}
+
+    upstream = REPO_FULL_NAME.lower()
+    for name in names:
+        try:
+            data = client.repo(f"{login}/{name}")
+        except github.GithubException as e:
+            if e.status == 404:
+                continue
+            raise
+        parents = {(data.get(k) or {}).get("full_name", "").lower() for k in ("parent", "source")}
+        if data.get("fork") and upstream in parents:
+            remember_fork(login, data["full_name"], data["ssh_url"])
+            return {"full_name": data["full_name"], "ssh_url": data["ssh_url"]}
+
+    owner, name = REPO_FULL_NAME.split("/")
+    nodes = client.graphql(FORKS_BY_OWNER_QUERY, {"owner": owner, "name": name})["repository"]["forks"]["nodes"]
+    if not nodes:
+        return None
+    remember_fork(login, nodes[0]["nameWithOwner"], nodes[0]["sshUrl"])
+    return {"full_name": nodes[0]["nameWithOwner"], "ssh_url": nodes[0]["sshUrl"]}
+
+
+# --- Clone Engine ---
+_reference_cache_lock = threading.Lock()
+
+def run_git(*args, cwd=None, check=True, input=None, env=None):
+    """Run a git command and return its stdout.
+
+    `input` may be bytes (e.g. a fast-import stream), which is passed through
+    as is; output is decoded as UTF-8 either way.
+    """
+    cmd = ["git", *args]
+    if env is not None:
+        env = {**os.environ, **env}
+    command = next(a for i, a in enumerate(args) if a != "-c" and (i == 0 or args[i - 1] != "-c"))
+    binary = isinstance(input, bytes)
+    with span(f"git {command}"):
+        result = subprocess.run(cmd, cwd=cwd, capture_output=True, text=not binary, input=input, env=env)
+    stdout, stderr = result.stdout, result.stderr
+    if binary:
+        stdout, stderr = stdout.decode(errors="replace"), stderr.decode(errors="replace")
+    if check and result.returncode != 0:
+        raise git.GitCommandError(cmd, result.returncode, stderr)
+    return stdout
+
+def update_reference_cache(url=None):
+    """Create or refresh the bare mirror that every clone borrows objects from."""
+    url = url or UPSTREAM_URL
+    with _reference_cache_lock:
+        if (REFERENCE_CACHE_PATH / "HEAD").exists():
+            run_git("fetch", "--prune", "--quiet", "origin", cwd=REFERENCE_CACHE_PATH)
+        else:
+            REFERENCE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            run_git("clone", "--mirror", "--quiet", url, str(REFERENCE_CACHE_PATH))
+        # Clones borrow objects from here through alternates; auto-gc must never prune
+        # the ones --prune left unreachable. Set on refresh too, for caches made before.
+        run_git("config", "gc.pruneExpire", "never", cwd=REFERENCE_CACHE_PATH)
+
+def refresh_clone(dest, url, branch="main"):
+    """Fetch into an existing clone and fast-forward `branch` if it is checked out."""
+    run_git("remote", "set-url", "origin", url, cwd=dest)
+    run_git("fetch", "--prune", "--quiet", "origin", cwd=dest)
+    current = run_git("symbolic-ref", "--short", "-q", "HEAD", cwd=dest, check=False).strip()
+    if current == branch:
+        run_git("merge", "--ff-only", "--quiet", f"origin/{branch}", cwd=dest, check=False)
+
+def clone_repo(url, dest, fast=FAST_CLONE, submodules=False):
+    """Clone `url` into `dest`, or refresh `dest` in place if it is already a clone.
+
+    In fast mode the clone is blobless (blobs are fetched on demand), only
+    SPARSE_CHECKOUT_DIRS are checked out, and objects already present in
+    REFERENCE_CACHE_PATH are borrowed through git alternates instead of
+    being downloaded again. Submodules are only needed to run Hugo, so by
+    default they are left for `ensure_submodules` to check out on demand.
+    """
+    dest = Path(dest)
+    if (dest / ".git").exists():
+        refresh_clone(dest, url)
+        return dest
+    if dest.exists():
+        # Only a skeleton of empty directories may be in the way, never anyone's files
+        if any(p.is_file() or p.is_symlink() for p in dest.rglob("*")):
+            raise RuntimeError(f"{dest} exists and is not a git clone; move it away first")
+        shutil.rmtree(dest)
+    args = ["clone", "--quiet"]
+    if fast:
+        args += ["--no-checkout", f"--filter={CLONE_FILTER}"]
+        if (REFERENCE_CACHE_PATH / "HEAD").exists():
+            args += ["--reference-if-able", str(REFERENCE_CACHE_PATH)]
+    run_git(*args, url, str(dest))
+    if fast:
+        run_git("sparse-checkout", "set", "--cone", *SPARSE_CHECKOUT_DIRS, cwd=dest)
+        run_git("checkout", "--quiet", cwd=dest)
+    if submodules:
+        ensure_submodules(dest)
+    return dest
+
+
+# --- Submodule Cache ---
+_submodule_locks = {}  # mirror path -> Lock
+_submodule_locks_lock = threading.Lock()
+# Submodules are cloned from local mirrors, which git refuses by default since 2.38.1
+_FILE_PROTOCOL = {"GIT_CONFIG_KEY_0": "protocol.file.allow", "GIT_CONFIG_VALUE_0": "always"}
+
+def _mirror_path(url):
+    name = re.sub(r"[^A-Za-z0-9._-]", "-", url.rstrip("/").rsplit("/", 1)[-1].removesuffix(".git"))
+    return SUBMODULE_CACHE_PATH / f"{name}-{hashlib.sha1(url.encode()).hexdigest()[:10]}.git"
+
+def submodule_mirror(url, commit=None):
+    """The cached bare mirror of `url`, cloned or fetched so that it has `commit`."""
+    mirror = _mirror_path(url)
+    with _submodule_locks_lock:
+        lock = _submodule_locks.setdefault(str(mirror), threading.Lock())
+    with lock:
+        if not (mirror / "HEAD").exists():
+            SUBMODULE_CACHE_PATH.mkdir(parents=True, exist_ok=True)
+            # Cloned next to the cache and moved in complete, `users` file included, so GC never
+            # sees a half-cloned mirror; a leftover from an interrupted clone is started over
+            partial = mirror.with_name(mirror.name + ".partial")
+            shutil.rmtree(partial, ignore_errors=True)
+            shutil.rmtree(mirror, ignore_errors=True)
+            run_git("clone", "--mirror", "--quiet", url, str(partial))
+            # Checkouts borrow objects from here; never prune one of them after a force-push upstream
+            run_git("config", "gc.pruneExpire", "never", cwd=partial)
+            (partial / "users").touch()
+            partial.rename(mirror)
+        elif commit and not run_git("rev-parse", "-q", "--verify", f"{commit}^{{commit}}", cwd=mirror, check=False):
+            run_git("fetch", "--prune", "--quiet", "origin", cwd=mirror)
+        (mirror / "users").touch()
+    return mirror
+
+def _submodules(root):
+    """[(name, path)] declared in `root`/.gitmodules."""
+    if not (Path(root) / ".gitmodules").exists():
+        return []
+    out = run_git("config", "-f", ".gitmodules", "-z", "--get-regexp", r"^submodule\..*\.path$", cwd=root, check=False)
+    pairs = [entry.split("\n", 1) for entry in out.split("\0") if entry]
+    return [(key[len("submodule."):-len(".path")], path) for key, path in pairs]
+
+def _recorded_commit(root, path):
+    entry = run_git("ls-files", "-s", "--", path, cwd=root).split()
+    return entry[1] if entry and entry[0] == "160000" else None
+
+def ensure_submodules(root, report=None):
+    """Check out the submodules of `root` that are missing or out of date; returns how many.
+
+    Each submodule is cloned from its mirror in SUBMODULE_CACHE_PATH, using
+    the mirror's objects through alternates. Checking out a theme therefore
+    costs one local checkout and no download, and no object is stored twice
+    on the host whatever the number of clones and worktrees.
+    """
+    root = Path(root)
+    submodules = _submodules(root)
+    if not submodules:
+        return 0
+    # "<state><sha> <path>[ (<describe>)]", state "-" = not checked out, "+" = other commit checked out
+    states = {line[1:].split(" ", 1)[1].split(" (")[0]: line[0]
+              for line in run_git("submodule", "status", cwd=root).splitlines() if line}
+    todo = [(name, path) for name, path in submodules if states.get(path) in ("-", "+")]
+    if todo:
+        run_git("submodule", "init", "--", *[path for _, path in todo], cwd=root)
+    for name, path in todo:
+        url = run_git("config", f"submodule.{name}.url", cwd=root).strip()
+        mirror = submodule_mirror(url, _recorded_commit(root, path))
+        if report:
+            report(f"Checking out {path} from the submodule cache")
+        env = {"GIT_CONFIG_COUNT": "2", **_FILE_PROTOCOL,
+               "GIT_CONFIG_KEY_1": f"submodule.{name}.url", "GIT_CONFIG_VALUE_1": str(mirror)}
+        run_git("submodule", "update", "--init", "--reference", str(mirror), "--", path, cwd=root, env=env)
+        gitdir = run_git("rev-parse", "--absolute-git-dir", cwd=root / path).strip()
+        with _submodule_locks_lock, open(mirror / "users", "a+") as users:
+            users.seek(0)
+            if gitdir not in users.read().splitlines():
+                users.write(gitdir + "\n")
+    # Nested submodules of the ones checked out, if any
+    return len(todo) + sum(ensure_submodules(root / path, report) for _, path in submodules)
+
+def warm_submodule_cache(root=None):
+    """Fetch mirrors for the submodules of `root` so a later preview needs no download."""
+    root = Path(root or CLONE_PATH)
+    for name, path in _submodules(root):
+        url = run_git("config", "-f", ".gitmodules", f"submodule.{name}.url", cwd=root).strip()
+        if url.startswith(("./", "../")):
+            continue  # resolved against the fork's URL only on `submodule init`
+        try:
+            submodule_mirror(url, _recorded_commit(root, path))
+        except git.GitCommandError as e:
+            print(f"Submodule cache not warmed for {url}: {e}")
+
+def gc_submodule_cache(max_age=SUBMODULE_CACHE_MAX_AGE):
+    """Repack the mirrors and remove those no live checkout uses and nobody used for `max_age`."""
+    removed = 0
+    for mirror in SUBMODULE_CACHE_PATH.glob("*.git"):
+        with _submodule_locks_lock:
+            lock = _submodule_locks.setdefault(str(mirror), threading.Lock())
+        # A mirror being cloned or fetched is in use; look at it on the next run
+        if not lock.acquire(blocking=False):
+            continue
+        try:
+            removed += _gc_submodule_mirror(mirror, max_age)
+        finally:
+            lock.release()
+    return removed
+
+def _gc_submodule_mirror(mirror, max_age):
+    """Remove `mirror` if unused (returns 1), else drop dead users and repack it; the caller holds its lock."""
+    with _submodule_locks_lock:
+        users_file = mirror / "users"
+        lines = users_file.read_text().splitlines() if users_file.exists() else []
+        live = [u for u in lines if Path(u).exists()]
+        last_used = (users_file if users_file.exists() else mirror).stat().st_mtime
+        if not live and time.time() - last_used > max_age:
+            shutil.rmtree(mirror, ignore_errors=True)
+            return 1
+        if live != lines:
+            stamp = os.stat(users_file)
+            users_file.write_text("".join(u + "\n" for u in live))
+            os.utime(users_file, ns=(stamp.st_atime_ns, stamp.st_mtime_ns))  # not a use
+    run_git("gc", "--auto", "--quiet", cwd=mirror, check=False)
+    return 0
+
+def _gc_submodule_cache():
+    while True:
+        time.sleep(SUBMODULE_GC_INTERVAL)
+        try:
+            gc_submodule_cache()
+        except Exception as e:
+            print(f"Submodule cache GC failed: {e}")
+
+
+# --- Worktree Pool ---
+class WorktreePool:
+    """Pre-warmed `git worktree`s of one clone, leased one per Gradio session.
+
+    All worktrees share the clone's object database, so each session gets its
+    own branch and index without another clone. Released worktrees are reset and
+    reused; a worktree with uncommitted changes is parked instead so nobody's
+    edits are thrown away. Parked worktrees belong to an owner that outlives
+    the Gradio session (the browser's workspace id, see `claim()`), so a
+    reloaded tab gets its worktree back; a worktree released clean only
+    leaves its branch behind, which `claim()` checks out again. `reap_parked()`
+    snapshots the changes of long-parked worktrees to `refs/parked/<name>` and
+    removes them, so abandoned edits do not hold on to the pool's capacity.
+    """
+
+    def __init__(self, repo_path, root, size=WORKTREE_POOL_SIZE, max_size=WORKTREE_MAX,
+                 idle_seconds=WORKTREE_IDLE_SECONDS, base="main"):
+        self.repo_path = Path(repo_path)
+        self.root = Path(root)
+        self.size = size
+        self.max_size = max_size
+        self.idle_seconds = idle_seconds
+        self.base = base
+        self._free = []
+        self._leases = {}  # session id -> (path, last used)
+        self._parked = {}  # path -> (owner, branch, parked at)
+        self._owners = {}  # session id -> owner; the session id itself if never claimed
+        self._branches = {}  # owner -> branch of the worktree it last released clean
+        self._pending = 0  # worktrees being created
+        self._lock = threading.Lock()
+
+    def _count(self):
+        return len(self._free) + len(self._leases) + len(self._parked) + self._pending
+
+    def _create(self):
+        path = self.root / f"wt-{uuid.uuid4().hex[:8]}"
+        self.root.mkdir(parents=True, exist_ok=True)
+        run_git("worktree", "add", "--quiet", "--detach", str(path), self.base, cwd=self.repo_path)
+        return path
+
+    def warm(self):
+        """Top the idle list up to `size` worktrees."""
+        while True:
+            with self._lock:
+                if len(self._free) + self._pending >= self.size or self._count() >= self.max_size:
+                    return
+                self._pending += 1
+            try:
+                path = self._create()
+            finally:
+                with self._lock:
+                    self._pending -= 1
+            with self._lock:
+                self._free.append(path)
+
+    def lease(self, session_id):
+        """Return the worktree bound to `session_id`, leasing one if needed.
+
+        A worktree the session's owner had parked is handed back before a new one is taken.
+        """
+        with self._lock:
+            if session_id in self._leases:
+                path = self._leases[session_id][0]
+                self._leases[session_id] = (path, time.monotonic())
+                return path
+            owner = self._owners.get(session_id, session_id)
+            path = next((p for p, (o, _, _) in self._parked.items() if o == owner), None)
+            if path is not None:
+                del self._parked[path]
+                self._leases[session_id] = (path, time.monotonic())
+                return path
+            path = self._free.pop() if self._free else None
+            full = path is None and self._count() >= self.max_size
+            if path is not None:
+                self._leases[session_id] = (path, time.monotonic())
+            elif not full:
+                self._pending += 1
+        if full:
+            # Make room from the longest-parked worktree; its changes are kept in refs/parked/*
+            if not self.reap_parked(max_age=0, limit=1):
+                raise RuntimeError("All worktrees are in use, try again later.")
+            return self.lease(session_id)
+        if path is None:
+            try:
+                path = self._create()
+            finally:
+                with self._lock:
+                    self._pending -= 1
+            with self._lock:
+                self._leases[session_id] = (path, time.monotonic())
+        threading.Thread(target=self.warm, daemon=True).start()
+        return path
+
+    def reattach(self, session_id, branch):
+        """Lease the parked worktree sitting on `branch` to `session_id`; None if there is none."""
+        with self._lock:
+            if session_id in self._leases:
+                return None
+            path = next((p for p, (_, b, _) in self._parked.items() if b == branch), None)
+            if path is not None:
+                del self._parked[path]
+                self._leases[session_id] = (path, time.monotonic())
+            return path
+
+    def claim(self, session_id, owner):
+        """Bind `session_id` to `owner` and give it back what the owner left behind.
+
+        Returns the worktree now leased to the session if it was the owner's
+        parked one, or a new one on the branch the owner last released clean;
+        None if there was nothing to give back.
+        """
+        with self._lock:
+            self._owners[session_id] = owner
+            if session_id in self._leases:
+                return None
+            parked = any(o == owner for o, _, _ in self._parked.values())
+            branch = None if parked else self._branches.pop(owner, None)
+        if not parked and not branch:
+            return None
+        path = self.lease(session_id)
+        if branch:
+            run_git("checkout", "--quiet", branch, cwd=path, check=False)
+        return path
+
+    def forget(self, session_id):
+        """Release the session's worktree and drop its owner binding; for when the tab is closed."""
+        self.release(session_id)
+        with self._lock:
+            self._owners.pop(session_id, None)
+
+    def release(self, session_id):
+        with self._lock:
+            lease = self._leases.pop(session_id, None)
+            owner = self._owners.get(session_id, session_id)
+        if lease is None:
+            return
+        path = lease[0]
+        dirty = run_git("status", "--porcelain", cwd=path).strip()
+        branch = run_git("symbolic-ref", "-q", "--short", "HEAD", cwd=path, check=False).strip()
+        if dirty:
+            with self._lock:
+                self._parked[path] = (owner, branch, time.monotonic())
+            return
+        run_git("checkout", "--quiet", "--detach", self.base, cwd=path)
+        with self._lock:
+            if branch:
+                self._branches[owner] = branch
+            self._free.append(path)
+
+    def _last_change(self, path):
+        """Monotonic time of the newest uncommitted file change in `path`, or None if it is clean."""
+        out = run_git("status", "--porcelain", "-z", "--untracked-files=all", cwd=path)
+        newest = None
+        for entry in out.split("\0"):
+            try:
+                mtime = (Path(path) / entry[3:]).stat().st_mtime
+            except (OSError, IndexError):
+                continue
+            newest = mtime if newest is None else max(newest, mtime)
+        if newest is None:
+            return None
+        return time.monotonic() - max(0.0, time.time() - newest)
+
+    def evict_idle(self):
+        """Release leases idle for `idle_seconds`; a file saved since (e.g. in code-server) counts as use."""
+        now = time.monotonic()
+        with self._lock:
+            idle = [(sid, path) for sid, (path, used) in self._leases.items() if now - used > self.idle_seconds]
+        released = 0
+        for sid, path in idle:
+            changed = self._last_change(path)
+            if changed is not None and now - changed <= self.idle_seconds:
+                self.touch(sid, changed)
+                continue
+            self.release(sid)
+            released += 1
+        return released
+
+    def touch(self, session_id, when=None):
+        with self._lock:
+            lease = self._leases.get(session_id)
+            if lease:
+                self._leases[session_id] = (lease[0], max(lease[1], when or time.monotonic()))
+
+    def _snapshot(self, path, name):
+        """Commit everything uncommitted in `path` to refs/parked/<name> without touching the worktree."""
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {"GIT_INDEX_FILE": str(Path(tmp) / "index")}
+            run_git("read-tree", "HEAD", cwd=path, env=env)
+            run_git("add", "-A", cwd=path, env=env)
+            tree = run_git("write-tree", cwd=path, env=env).strip()
+        ident = {"GIT_AUTHOR_NAME": "Hugo Blog Manager", "GIT_AUTHOR_EMAIL": "hugo-blog-manager@localhost",
+                 "GIT_COMMITTER_NAME": "Hugo Blog Manager", "GIT_COMMITTER_EMAIL": "hugo-blog-manager@localhost"}
+        commit = run_git("commit-tree", tree, "-p", "HEAD", "-m", f"Uncommitted changes of {name}",
+                         cwd=path, env=ident).strip()
+        run_git("update-ref", f"refs/parked/{name}", commit, cwd=path)
+        return commit
+
+    def reap_parked(self, max_age=WORKTREE_PARKED_SECONDS, limit=None):
+        """Snapshot and remove worktrees parked for longer than `max_age`, oldest first; returns how many."""
+        now = time.monotonic()
+        with self._lock:
+            old = sorted(((at, path, owner, branch) for path, (owner, branch, at) in self._parked.items()
+                          if now - at >= max_age), key=lambda item: item[0])[:limit]
+            for _, path, _, _ in old:
+                del self._parked[path]
+        removed = 0
+        for _, path, owner, branch in old:
+            name = f"{branch or 'detached'}/{path.name}"
+            try:
+                commit = self._snapshot(path, name)
+                print(f"Removed parked worktree {path}; its changes are in refs/parked/{name} ({commit[:12]})")
+            except git.GitCommandError as e:
+                print(f"Could not snapshot parked worktree {path}: {e}")
+                with self._lock:
+                    self._parked[path] = (owner, branch, now)
+                continue
+            run_git("worktree", "remove", "--force", str(path), cwd=self.repo_path, check=False)
+            if branch:
+                with self._lock:
+                    self._branches[owner] = branch
+            removed += 1
+        return removed
+
+    def cleanup(self):
+        """Remove every worktree this pool created, including parked ones."""
+        with self._lock:
+            paths = self._free + [p for p, _ in self._leases.values()] + list(self._parked)
+            self._free, self._leases, self._parked = [], {}, {}
+        for path in paths:
+            run_git("worktree", "remove", "--force", str(path), cwd=self.repo_path, check=False)
+        run_git("worktree", "prune", cwd=self.repo_path, check=False)
+
+    def current(self, session_id):
+        """The worktree leased to `session_id`, or None; unlike `lease` it never creates one.
+
+        Polling counts as use, so an open tab keeps its lease.
+        """
+        with self._lock:
+            lease = self._leases.get(session_id)
+            if lease is None:
+                return None
+            self._leases[session_id] = (lease[0], time.monotonic())
+            return lease[0]
+
+    def stats(self):
+        with self._lock:
+            return {"free": len(self._free), "leased": len(self._leases), "parked": len(self._parked)}
+
+
+WORKTREES = WorktreePool(CLONE_PATH, WORKTREE_ROOT)
+
+def _evict_idle_worktrees():
+    while True:
+        time.sleep(60)
+        try:
+            WORKTREES.evict_idle()
+            WORKTREES.reap_parked()
+        except Exception as e:
+            print(f"Worktree eviction failed: {e}")
+
+def session_tree(request):
+    """Working tree for this Gradio session: a leased worktree, or CLONE_PATH."""
+    if request is None or not (CLONE_PATH / ".git").exists():
+        return CLONE_PATH
+    return WORKTREES.lease(request.session_hash)
+
+def restore_session(state, root):
+    """Point a reloaded session at the branch and article of the worktree it got back."""
+    state.branch = run_git("symbolic-ref", "-q", "--short", "HEAD", cwd=root, check=False).strip()
+    changed = run_git("diff", "--name-only", WORKTREES.base, "--", "content/blog", cwd=root, check=False).split()
+    changed += run_git("ls-files", "--others", "--exclude-standard", "--", "content/blog", cwd=root).split()
+    index = next((Path(root) / p for p in changed if p.endswith("/index.md") and (Path(root) / p).exists()), None)
+    if index is not None:
+        state.article_folder = str(index.parent)
+        try:
+            state.article_title = str(parse_front_matter(index.read_text()).get("title", ""))
+        except ValueError:
+            state.article_title = ""
+
+def tree_paths(root):
+    """content/authors, data/authors and content/blog inside a working tree."""
+    root = Path(root)
+    return root / "content/authors", root / "data/authors", root / "content/blog"
+
+
+# --- Plumbing Commits ---
+def attach_branch(root, branch, base_sha):
+    """Point the worktree at `branch` without rewriting its working tree if possible.
+
+    A worktree still sitting on `base_sha` already has every file of a branch
+    made from it on disk, so only HEAD and the index need to move.
+    """
+    head = run_git("rev-parse", "HEAD", cwd=root).strip()
+    if head == base_sha:
+        run_git("symbolic-ref", "HEAD", f"refs/heads/{branch}", cwd=root)
+        try:
+            run_git("reset", "--quiet", cwd=root)
+        except git.GitCommandError:
+            run_git("update-ref", "--no-deref", "HEAD", head, cwd=root)  # detached on base again
+            raise
+    else:
+        run_git("checkout", "--quiet", branch, cwd=root)
+
+def commit_files(root, branch, paths, message, actor, base="main"):
+    """Commit `paths` on top of `base` as a new `branch`, without a checkout.
+
+    The tree is built in a temporary index seeded from `base`, where only
+    `paths` (relative to `root`) are hashed and staged. The commit and the
+    `refs/heads/<branch>` ref are written directly; the working tree and the
+    worktree's own index are left alone. Returns the new commit's and the base's SHAs.
+    """
+    base_sha = run_git("rev-parse", f"{base}^{{commit}}", cwd=root).strip()
+    paths = [str(p) for p in paths]
+    shas = run_git("hash-object", "-w", "--stdin-paths", cwd=root, input="\n".join(paths) + "\n").split()
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {"GIT_INDEX_FILE": str(Path(tmp) / "index")}
+        run_git("read-tree", base_sha, cwd=root, env=env)
+        index_info = "".join(f"100644 {sha}\t{path}\n" for sha, path in zip(shas, paths))
+        run_git("update-index", "--add", "--index-info", cwd=root, env=env, input=index_info)
+        tree = run_git("write-tree", cwd=root, env=env).strip()
+    ident = {"GIT_AUTHOR_NAME": actor.name, "GIT_AUTHOR_EMAIL": actor.email,
+             "GIT_COMMITTER_NAME": actor.name, "GIT_COMMITTER_EMAIL": actor.email}
+    commit = run_git("commit-tree", tree, "-p", base_sha, "-m", message, cwd=root, env=ident).strip()
+    # An all-zero old value makes update-ref fail if the branch already exists
+    run_git("update-ref", f"refs/heads/{branch}", commit, "0" * 40, cwd=root)
+    return commit, base_sha
+
+
+# --- Session State ---
+class SessionLog:
+    """Bounded per-session log with secret redaction and sequence-numbered lines.
+
+    Clients keep the sequence number of the last line they received and ask
+    for `since(seq)`, so each update carries only new lines and memory per
+    session is capped at LOG_BUFFER_LINES.
+    """
+
+    def __init__(self, maxlen=LOG_BUFFER_LINES):
+        self._lines = deque(maxlen=maxlen)  # (seq, level, text)
+        self._seq = 0
+        self._secrets = set()
+        self._lock = threading.Lock()
+
+    def add_secret(self, value):
+        if value:
+            with self._lock:
+                self._secrets.add(value)
+
+    def redact(self, text):
+        text = SECRET_RE.sub("***", text)
+        for secret in self._secrets:
+            text = text.replace(secret, "***")
+        return text
+
+    def write(self, message, level="INFO"):
+        with self._lock:
+            self._seq += 1
+            line = f"{datetime.now():%H:%M:%S} {level:<7} {self.redact(str(message))}"
+            self._lines.append((self._seq, LOG_LEVELS[level], line))
+            return self._seq
+
+    def since(self, seq, min_level="INFO"):
+        """Lines newer than `seq` at `min_level` or above, and the latest seq."""
+        threshold = LOG_LEVELS[min_level]
+        with self._lock:
+            lines = [text for n, lvl, text in self._lines if n > seq and lvl >= threshold]
+            return lines, self._seq
+
+    def delta(self, seq, min_level="INFO", reset=False):
+        """JSON payload for the log viewer; `reset` replaces the shown lines."""
+        lines, last = self.since(-1 if reset else seq, min_level)
+        return json.dumps({"seq": last, "reset": reset, "lines": lines}), last
+
+
+@dataclass
+class SessionState:
+    pat: str = ""
+    email: str = ""
+    article_folder: str = ""
+    article_title: str = ""
+    branch: str = ""  # branch of the article being worked on, also when the worktree's HEAD is detached
+    workspace: str = ""  # browser-persisted id that owns this session's worktree across reloads
+    log_level: str = "INFO"
+    log: SessionLog = field(default_factory=SessionLog)
+    changes_shown: tuple = ()  # (tree, generation) of the pending changes last sent to the browser
+
+
+class StateStore:
+    """Per-session state kept in memory, with write-behind persistence of settings.
+
+    `.env` is parsed once at startup. Setting changes are coalesced for
+    ENV_FLUSH_DELAY seconds and written back in a single atomic file write.
+    New sessions are seeded from the settings only when `single_user` is set;
+    otherwise a PAT saved by one user would be handed to everybody else.
+    """
+
+    def __init__(self, env_path=ENV_PATH, flush_delay=ENV_FLUSH_DELAY, single_user=SINGLE_USER):
+        self.env_path = Path(env_path)
+        self.flush_delay = flush_delay
+        self.single_user = single_user
+        self.settings = {}
+        self.version = 0  # bumped on every setting change, for cache invalidation
+        self._sessions = {}
+        self._dirty = {}  # settings changed since the last flush
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Read settings from the environment and .env; called once at startup."""
+        from dotenv import dotenv_values
+        settings = {k: os.environ[k] for k in ENV_KEYS if os.environ.get(k)}
+        if self.env_path.exists():
+            settings.update({k: v for k, v in dotenv_values(self.env_path).items() if v})
+        with self._lock:
+            self.settings.update(settings)
+            self.version += 1
+
+    def session(self, session_id):
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None:
+                seed = self.settings if self.single_user else {}
+                state = self._sessions[session_id] = SessionState(
+                    pat=seed.get("GITHUB_PAT", ""),
+                    email=seed.get("USER_EMAIL", ""),
+                )
+                state.log.add_secret(state.pat)
+            return state
+
+    def drop(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def get_setting(self, key, default=None):
+        return self.settings.get(key, default)
+
+    def remember(self, key, value):
+        """Persist a session's credential to .env, in single-user mode only; returns whether it did."""
+        if not self.single_user:
+            return False
+        self.set_setting(key, value)
+        return True
+
+    def set_setting(self, key, value):
+        with self._lock:
+            if self.settings.get(key) == value:
+                return
+            self.settings[key] = self._dirty[key] = value
+            self.version += 1
+            if self._timer is None:
+                self._timer = threading.Timer(self.flush_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Write changed settings to .env, keeping unrelated lines and comments."""
+        with self._lock:
+            self._timer = None
+            settings, self._dirty = self._dirty, {}
+        if not settings:
+            return
+        lines = self.env_path.read_text().splitlines() if self.env_path.exists() else []
+        written = set()
+        for i, line in enumerate(lines):
+            key = line.split("=", 1)[0].strip()
+            if key in settings:
+                lines[i] = f"{key}='{settings[key]}'"
+                written.add(key)
+        lines += [f"{k}='{v}'" for k, v in settings.items() if k not in written]
+        content = "\n".join(lines) + "\n"
+        tmp = self.env_path.with_name(self.env_path.name + ".tmp")
+        with span("env flush"):
+            tmp.write_text(content)
+            try:
+                os.replace(tmp, self.env_path)
+            except OSError:
+                # .env is a single-file bind mount in docker-compose, which can't be renamed over
+                tmp.unlink()
+                self.env_path.write_text(content)
+
+
+STATE = StateStore()
+
+def session_state(request):
+    return STATE.session(request.session_hash if request else "default")
+
+
+# --- Job Engine ---
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    """A queued unit of git/GitHub work that reports progress as it runs."""
+
+    def __init__(self, name, session_id=None, log=None):
+        self.name = name
+        self.session_id = session_id
+        self.log = log
+        self.future = None
+        self._progress = queue.Queue()
+        self._cancelled = threading.Event()
+
+    def report(self, message, level="INFO"):
+        """Record a progress line; also the point where cancellation takes effect."""
+        if self.log is not None:
+            message = self.log.redact(str(message))
+            self.log.write(message, level)
+        self._progress.put(message)
+        self.check()
+
+    def check(self):
+        if self._cancelled.is_set():
+            raise JobCancelled(f"{self.name} cancelled")
+
+    def cancel(self):
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def stream(self, poll=0.1):
+        """Yield progress lines until the job has finished."""
+        while True:
+            try:
+                yield self._progress.get(timeout=poll)
+            except queue.Empty:
+                if self.future.done():
+                    break
+        while not self._progress.empty():
+            yield self._progress.get_nowait()
+
+    def result(self):
+        if self.future.cancelled():
+            raise JobCancelled(f"{self.name} cancelled")
+        return self.future.result()
+
+
+class JobEngine:
+    """Thread pools for blocking git and GitHub work, one per kind of job.
+
+    Network and disk work have separate concurrency limits, so a slow push
+    can't starve local commits. Jobs beyond the limit wait in the pool's queue.
+    """
+
+    def __init__(self, limits=JOB_CONCURRENCY):
+        self._pools = {kind: ThreadPoolExecutor(max_workers=n, thread_name_prefix=f"job-{kind}")
+                       for kind, n in limits.items()}
+        self._active = {kind: set() for kind in limits}
+        self._lock = threading.Lock()
+
+    def submit(self, kind, fn, *args, name=None, session_id=None, log=None):
+        """Queue `fn(job, *args)` on the `kind` pool and return its Job."""
+        job = Job(name or fn.__name__.strip("_").removesuffix("_job"), session_id, log)
+        with self._lock:
+            self._active[kind].add(job)
+        job.future = self._pools[kind].submit(self._run, job, fn, args)
+        job.future.add_done_callback(lambda _: self._done(kind, job))
+        return job
+
+    @staticmethod
+    def _run(job, fn, args):
+        with handler_trace(job.name):
+            return fn(job, *args)
+
+    def _done(self, kind, job):
+        with self._lock:
+            self._active[kind].discard(job)
+
+    def cancel_session(self, session_id):
+        with self._lock:
+            jobs = [j for active in self._active.values() for j in active if j.session_id == session_id]
+        for job in jobs:
+            job.cancel()
+        return len(jobs)
+
+    def depth(self):
+        """Queued plus running jobs per kind."""
+        with self._lock:
+            return {kind: len(active) for kind, active in self._active.items()}
+
+
+JOBS = JobEngine()
+
+def stream_job(kind, fn, args, log_cursor, n_outputs, request=None):
+    """Run `fn` as a job and stream its progress to the UI.
+
+    `fn` returns the handler's `n_outputs` outputs. Every update is followed by
+    the new log cursor and a log delta holding only the lines added since.
+    """
+    state = session_state(request)
+    job = JOBS.submit(kind, fn, *args, session_id=request.session_hash if request else None, log=state.log)
+    for line in job.stream():
+        delta, log_cursor = state.log.delta(log_cursor, state.log_level)
+        yield (f"⏳ {line}",) + (gr.update(),) * (n_outputs - 1) + (log_cursor, delta)
+    try:
+        outputs = job.result()
+    except JobCancelled:
+        state.log.write(f"{job.name} cancelled", "WARNING")
+        outputs = ("❌ Cancelled",) + (gr.update(),) * (n_outputs - 1)
+    except Exception as e:
+        state.log.write(f"{job.name} failed: {e}", "ERROR")
+        outputs = (f"❌ {e}",) + (gr.update(),) * (n_outputs - 1)
+    if not isinstance(outputs, tuple):
+        outputs = (outputs,)
+    delta, log_cursor = state.log.delta(log_cursor, state.log_level)
+    yield outputs + (log_cursor, delta)
+
+def set_log_level(level, request: gr.Request):
+    """Change the session's level filter and resend the buffered lines."""
+    state = session_state(request)
+    state.log_level = level
+    delta, cursor = state.log.delta(0, level, reset=True)
+    return cursor, delta
+
+def cancel_jobs(request: gr.Request):
+    count = JOBS.cancel_session(request.session_hash)
+    return f"⏹ Cancelling {count} job(s)" if count else "Nothing to cancel"
+
+
+# --- Push Queue ---
+class PushTicket:
+    """Outcome of a queued push; shared by every request coalesced into it."""
+
+    def __init__(self):
+        self.ok = None
+        self.message = "queued"
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def done(self):
+        return self._done.is_set()
+
+    def _finish(self, ok, message):
+        self.ok, self.message = ok, message
+        self._done.set()
+
+
+class _PendingPush:
+    def __init__(self, git_dir, branch):
+        self.git_dir = git_dir
+        self.branch = branch
+        self.tickets = [PushTicket()]
+        self.logs = []
+        self.attempts = 0
+        self.due = 0.0
+
+    def report(self, message, level="INFO"):
+        for log in self.logs:
+            log.write(message, level)
+
+    def finish(self, ok, message):
+        for ticket in self.tickets:
+            ticket._finish(ok, message)
+
+
+class PushQueue:
+    """Background pushes of local branches to `origin`, one request per branch.
+
+    Pushes of a branch that is already queued are merged into the queued one,
+    and a push requested while the same branch is being pushed runs once the
+    first one is done, so a burst of clicks costs at most two pushes. The
+    pushed commit is compared with the branch on origin (`ls-remote`, since
+    the local tracking ref can be stale) first and nothing is sent if the
+    remote already has it. Transient failures are
+    retried with exponential backoff; rejections and auth errors are not.
+
+    `runner` is `run_git` by default and can be swapped to inject latency or
+    failures.
+    """
+
+    def __init__(self, workers=PUSH_WORKERS, retries=PUSH_RETRIES, backoff=PUSH_BACKOFF, runner=None):
+        self.retries = retries
+        self.backoff = backoff
+        self.runner = runner or run_git
+        self._queued = {}  # (git_dir, branch) -> _PendingPush
+        self._running = set()
+        self._cond = threading.Condition()
+        self._workers = workers
+        self._started = False
+
+    def _start(self):
+        for i in range(self._workers):
+            threading.Thread(target=self._work, name=f"push-{i}", daemon=True).start()
+        self._started = True
+
+    def request(self, root, branch, log=None):
+        """Queue a push of `branch` from the repository at `root` and return its ticket."""
+        git_dir = str(Path(root, self.runner("rev-parse", "--git-common-dir", cwd=root).strip()).resolve())
+        key = (git_dir, branch)
+        with self._cond:
+            if not self._started:
+                self._start()
+            pending = self._queued.get(key)
+            coalesced = pending is not None
+            if not coalesced:
+                pending = self._queued[key] = _PendingPush(git_dir, branch)
+            if log is not None and log not in pending.logs:
+                pending.logs.append(log)
+            self._cond.notify()
+        if log is not None:
+            log.write(f"Push of '{branch}' {'merged into the queued push' if coalesced else 'queued'}")
+        METRICS.inc("push_requests_total", coalesced=str(coalesced).lower())
+        return pending.tickets[0]
+
+    def depth(self):
+        with self._cond:
+            return {"queued": len(self._queued), "running": len(self._running)}
+
+    def _next(self):
+        """The due push to run next, or None and how long to wait for one."""
+        now = time.monotonic()
+        ready = [p for key, p in self._queued.items() if key not in self._running]
+        if not ready:
+            return None, None
+        pending = min(ready, key=lambda p: p.due)
+        if pending.due > now:
+            return None, pending.due - now
+        return pending, None
+
+    def _work(self):
+        while True:
+            with self._cond:
+                pending, wait = self._next()
+                while pending is None:
+                    self._cond.wait(wait)
+                    pending, wait = self._next()
+                key = (pending.git_dir, pending.branch)
+                del self._queued[key]
+                self._running.add(key)
+            try:
+                with handler_trace("push"):
+                    self._attempt(pending)
+            finally:
+                with self._cond:
+                    self._running.discard(key)
+                    self._cond.notify_all()
+
+    def _attempt(self, pending):
+        branch, git_dir = pending.branch, pending.git_dir
+        try:
+            local = self.runner("rev-parse", "--verify", "--quiet", f"refs/heads/{branch}",
+                                cwd=git_dir, check=False).strip()
+            if not local:
+                METRICS.inc("pushes_total", result="failed")
+                pending.report(f"Push of '{branch}' failed: no such branch", "ERROR")
+                pending.finish(False, f"❌ Branch '{branch}' does not exist")
+                return
+            # Counted before ls-remote too, so an unreachable remote stops retrying
+            pending.attempts += 1
+            remote = self.runner("ls-remote", "origin", f"refs/heads/{branch}", cwd=git_dir).split("\t")[0]
+            if local == remote:
+                METRICS.inc("pushes_total", result="noop")
+                pending.report(f"'{branch}' is already up to date on origin")
+                pending.finish(True, f"✅ '{branch}' is already up to date")
+                return
+            self.runner("push", "--thin", "--quiet", "origin", f"{local}:refs/heads/{branch}", cwd=git_dir)
+            self.runner("update-ref", f"refs/remotes/origin/{branch}", local, cwd=git_dir)
+        except git.GitCommandError as e:
+            error = str(e.stderr).strip() or str(e)
+            permanent = any(marker in error for marker in PUSH_PERMANENT_ERRORS)
+            if permanent or pending.attempts > self.retries:
+                METRICS.inc("pushes_total", result="failed")
+                pending.report(f"Push of '{branch}' failed: {error}", "ERROR")
+                pending.finish(False, f"❌ Push failed: {error}")
+                return
+            delay = min(self.backoff * 2 ** (pending.attempts - 1), PUSH_BACKOFF_MAX)
+            METRICS.inc("pushes_total", result="retry")
+            pending.report(f"Push of '{branch}' failed, retrying in {delay:.0f}s: {error}", "WARNING")
+            self._requeue(pending, delay)
+            return
+        METRICS.inc("pushes_total", result="pushed")
+        pending.report(f"Pushed '{branch}' ({local[:10]})")
+        pending.finish(True, f"✅ Pushed '{branch}'")
+
+    def _requeue(self, pending, delay):
+        key = (pending.git_dir, pending.branch)
+        pending.due = time.monotonic() + delay
+        with self._cond:
+            newer = self._queued.get(key)
+            if newer is None:
+                self._queued[key] = pending
+            else:
+                # A newer request for the branch arrived meanwhile: it pushes for both
+                newer.logs += [log for log in pending.logs if log not in newer.logs]
+                newer.due = max(newer.due, pending.due)
+                newer.attempts = pending.attempts
+                newer.tickets += pending.tickets
+            self._cond.notify()
+
+
+PUSHES = PushQueue()
+
+
+# --- Content Index ---
+FRONT_MATTER_RE = re.compile(r"\A---\s*\n(.*?)\n---\s*(?:\n|\Z)", re.S)
+
+def parse_front_matter(text):
+    """Return the YAML front matter of a Markdown file as a dict.
+
+    Raises ValueError if the front matter is missing or not valid YAML.
+    """
+    import yaml
+    match = FRONT_MATTER_RE.match(text)
+    if not match:
+        raise ValueError("missing front matter")
+    try:
+        data = yaml.load(match.group(1), Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+    except yaml.YAMLError as e:
+        raise ValueError(f"invalid YAML front matter: {e}") from e
+    if not isinstance(data, dict):
+        raise ValueError("front matter is not a mapping")
+    return data
+
+
+class ContentIndex:
+    """SQLite index of the front matter of every content/blog/**/index.md.
+
+    The first `update()` walks the tree. Later ones only re-read files that
+    changed since the last indexed commit (`git diff --name-only`) or are
+    modified/untracked in the working tree, so lookups never walk the tree.
+    """
+
+    def __init__(self, root, db_path=CONTENT_INDEX_PATH, min_interval=CONTENT_INDEX_MIN_INTERVAL):
+        self.root = Path(root)
+        self.db_path = Path(db_path)
+        self.min_interval = min_interval
+        self._db = None
+        self._last_update = 0.0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._db is None:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS articles (
+                    path TEXT PRIMARY KEY, slug TEXT, title TEXT, date TEXT, mtime_ns INTEGER);
+                CREATE INDEX IF NOT EXISTS articles_slug ON articles(slug);
+                CREATE TABLE IF NOT EXISTS article_authors (path TEXT, author TEXT);
+                CREATE INDEX IF NOT EXISTS article_authors_author ON article_authors(author);
+                CREATE INDEX IF NOT EXISTS article_authors_path ON article_authors(path);
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            """)
+        return self._db
+
+    def _meta(self, key, default=None):
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key, value):
+        self._db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    def _index_file(self, rel):
+        """(Re)index one content/blog/.../index.md path; drops it if it's gone."""
+        db = self._db
+        db.execute("DELETE FROM articles WHERE path = ?", (rel,))
+        db.execute("DELETE FROM article_authors WHERE path = ?", (rel,))
+        path = self.root / rel
+        try:
+            stat = path.stat()
+            meta = parse_front_matter(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError, UnicodeDecodeError):
+            return
+        authors = meta.get("authors") or []
+        authors = [authors] if isinstance(authors, str) else authors
+        db.execute("INSERT INTO articles VALUES (?, ?, ?, ?, ?)",
+                   (rel, path.parent.name, str(meta.get("title", "")), str(meta.get("date", "")), stat.st_mtime_ns))
+        db.executemany("INSERT INTO article_authors VALUES (?, ?)", [(rel, str(a)) for a in authors])
+
+    def _git_head(self):
+        return run_git("rev-parse", "HEAD", cwd=self.root, check=False).strip() or None
+
+    def _changed_paths(self, since):
+        """Paths under content/blog changed since commit `since`, plus dirty ones."""
+        diff = run_git("diff", "--name-only", "-z", "--no-renames", since, "HEAD", "--", "content/blog", cwd=self.root)
+        status = run_git("status", "--porcelain", "-z", "--untracked-files=all", "--", "content/blog", cwd=self.root)
+        dirty = {entry[3:] for entry in status.split("\0") if len(entry) > 3}
+        return set(filter(None, diff.split("\0"))) | dirty, dirty
+
+    def _full_scan(self):
+        db = self._db
+        db.execute("DELETE FROM articles")
+        db.execute("DELETE FROM article_authors")
+        blog = self.root / "content/blog"
+        count = 0
+        for dirpath, _, filenames in os.walk(blog):
+            if "index.md" in filenames:
+                self._index_file(os.path.relpath(os.path.join(dirpath, "index.md"), self.root))
+                count += 1
+        return count
+
+    def update(self, force=False):
+        """Bring the index up to date; returns the number of files re-read."""
+        with self._lock:
+            if not force and time.monotonic() - self._last_update < self.min_interval:
+                return 0
+            db = self._connect()
+            head = self._git_head()
+            last = self._meta("commit")
+            changed, dirty = None, set()
+            if head and last:
+                try:
+                    changed, dirty = self._changed_paths(last)
+                except git.GitCommandError:
+                    pass  # e.g. the last indexed commit is gone; rebuild below
+            if changed is None:
+                count = self._full_scan()
+                if head:
+                    dirty = self._changed_paths(head)[1]
+            else:
+                changed |= set(json.loads(self._meta("dirty", "[]")))  # may have been reverted
+                count = 0
+                for rel in changed:
+                    if rel.endswith("/index.md"):
+                        self._index_file(rel)
+                        count += 1
+            self._set_meta("commit", head)
+            self._set_meta("dirty", json.dumps(sorted(dirty)))
+            db.commit()
+            self._last_update = time.monotonic()
+            return count
+
+    def find_slug(self, slug):
+        """Paths of existing articles whose directory is named `slug`."""
+        self.update()
+        with self._lock:
+            return [r[0] for r in self._db.execute("SELECT path FROM articles WHERE slug = ?", (slug,))]
+
+    def articles_by_author(self, author):
+        self.update()
+        with self._lock:
+            return self._db.execute(
+                "SELECT a.path, a.title, a.date FROM articles a JOIN article_authors aa ON aa.path = a.path "
+                "WHERE aa.author = ? ORDER BY a.date DESC", (author,)).fetchall()
+
+    def author_counts(self):
+        self.update()
+        with self._lock:
+            return dict(self._db.execute("SELECT author, COUNT(*) FROM article_authors GROUP BY author"))
+
+
+CONTENT_INDEX = ContentIndex(CLONE_PATH)
+
+
+# --- Validation ---
+VALIDATED_PATHS = ["content/blog", "content/authors", "data/authors"]
+
+def _content_kind(path):
+    """Which check applies to a repo-relative path, or None."""
+    parts = path.split("/")
+    if path.startswith("content/blog/") and parts[-1] == "index.md":
+        return "article"
+    if path.startswith("content/authors/") and len(parts) == 4 and parts[-1] == "_index.md":
+        return "author_page"
+    if path.startswith("data/authors/") and len(parts) == 3 and path.endswith(".json"):
+        return "author_data"
+    return None
+
+def _parse_content(kind, text):
+    """(authors, error) for the text of one content file."""
+    authors, error = None, None
+    try:
+        if kind == "author_data":
+            data = json.loads(text)
+            if not isinstance(data, dict) or not data.get("name"):
+                error = 'author data has no "name"'
+        else:
+            meta = parse_front_matter(text)
+            if kind == "article":
+                if not meta.get("title"):
+                    error = "front matter has no title"
+                authors = meta.get("authors") or []
+                authors = [str(a) for a in ([authors] if isinstance(authors, str) else authors)]
+    except ValueError as e:
+        error = " ".join(str(e).split())  # YAML errors span several lines
+    return authors, error
+
+def _parse_content_files(items):
+    """[(authors, error)] for [(kind, path)]; runs in the validator's worker processes."""
+    results = []
+    for kind, path in items:
+        try:
+            results.append(_parse_content(kind, Path(path).read_text(encoding="utf-8")))
+        except (OSError, UnicodeDecodeError) as e:
+            results.append((None, " ".join(str(e).split())))
+    return results
+
+
+class Validator:
+    """Pre-commit checks of front matter, author references and article slugs.
+
+    Only files that differ from the merge base with `base` are checked. Parse
+    results are cached by blob SHA, so a file is parsed once per content no
+    matter how many commits or worktrees it appears in; large batches of
+    uncached files are parsed in a process pool. Author references and slugs
+    are cross-checked on every run against AUTHORS and CONTENT_INDEX.
+    """
+
+    def __init__(self, workers=VALIDATION_WORKERS, parallel_min=VALIDATION_PARALLEL_MIN,
+                 cache_size=VALIDATION_CACHE_SIZE):
+        self.workers = workers
+        self.parallel_min = parallel_min
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()  # (kind, blob sha) -> (authors, error)
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _blobs(self, root, base, full):
+        """{path: blob sha} of the files to check."""
+        shas = {}
+        merge_base = None if full else run_git("merge-base", base, "HEAD", cwd=root, check=False).strip()
+        if merge_base:
+            listed = run_git("diff", "--name-only", "-z", "--no-renames", merge_base, "--", *VALIDATED_PATHS, cwd=root)
+            listed += run_git("ls-files", "-z", "--others", "--exclude-standard", "--", *VALIDATED_PATHS, cwd=root)
+        else:
+            # Everything: tracked files are hashed already, only dirty ones need hash-object
+            for entry in run_git("ls-files", "-z", "-s", "--", *VALIDATED_PATHS, cwd=root).split("\0"):
+                if entry:
+                    info, path = entry.split("\t", 1)
+                    shas[path] = info.split()[1]
+            listed = run_git("ls-files", "-z", "--modified", "--others", "--exclude-standard", "--",
+                             *VALIDATED_PATHS, cwd=root)
+        stale = []
+        for path in filter(None, listed.split("\0")):
+            shas.pop(path, None)
+            if _content_kind(path) and (Path(root) / path).is_file():
+                stale.append(path)
+        if stale:
+            hashed = run_git("hash-object", "--stdin-paths", cwd=root, input="\n".join(stale) + "\n").split()
+            shas.update(zip(stale, hashed))
+        return {path: sha for path, sha in shas.items() if _content_kind(path)}
+
+    def _parse(self, root, blobs):
+        """Parse results for every (path, sha), reading only uncached blobs."""
+        keys = {path: (_content_kind(path), sha) for path, sha in blobs.items()}
+        with self._lock:
+            todo = [path for path, key in keys.items() if key not in self._cache]
+            self.hits += len(keys) - len(todo)
+            self.misses += len(todo)
+        items = [(keys[path][0], str(Path(root) / path)) for path in todo]
+        if len(items) >= self.parallel_min and self.workers > 1:
+            if self._pool is None:
+                import multiprocessing
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            size = -(-len(items) // (self.workers * 4))
+            chunks = [items[i:i + size] for i in range(0, len(items), size)]
+            try:
+                parsed = [r for batch in self._pool.map(_parse_content_files, chunks) for r in batch]
+            except BrokenProcessPool:
+                self._pool = None
+                raise
+        else:
+            parsed = _parse_content_files(items)
+        with self._lock:
+            for path, result in zip(todo, parsed):
+                self._cache[keys[path]] = result
+            results = {path: self._cache.get(key) for path, key in keys.items()}
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return results
+
+    def validate(self, root, base="main", full=False):
+        """Problems ("path: message") in the files changed since the merge base with `base`.
+
+        With `full` (or without a merge base) every content file is checked.
+        """
+        with span("validate"):
+            blobs = self._blobs(root, base, full)
+            results = self._parse(root, blobs)
+            known = set(author_index(root).data_names())
+            known.update(Path(p).stem for p in results if _content_kind(p) == "author_data")
+            problems = []
+            slugs = {}
+            for path, (authors, error) in sorted(results.items()):
+                if error:
+                    problems.append(f"{path}: {error}")
+                for author in authors or ():
+                    if author not in known:
+                        problems.append(f"{path}: unknown author '{author}' (no data/authors/{author}.json)")
+                if _content_kind(path) == "article":
+                    slugs.setdefault(Path(path).parent.name, []).append(path)
+            for slug, paths in slugs.items():
+                others = set(paths) if full else set(paths) | set(CONTENT_INDEX.find_slug(slug))
+                if len(others) > 1:
+                    for path in paths:
+                        dupes = ", ".join(sorted(others - {path}))
+                        problems.append(f"{path}: slug '{slug}' is also used by {dupes}")
+            return problems
+
+    def check_files(self, files, known=()):
+        """Problems in generated files ({path: text}) before they are written or committed.
+
+        Authors must be in `known` or have a data file among `files`.
+        """
+        known = set(known) | {Path(p).stem for p in files if _content_kind(p) == "author_data"}
+        problems = []
+        for path, text in sorted(files.items()):
+            kind = _content_kind(path)
+            if kind is None:
+                continue
+            authors, error = _parse_content(kind, text)
+            if error:
+                problems.append(f"{path}: {error}")
+            problems += [f"{path}: unknown author '{a}' (no data/authors/{a}.json)"
+                         for a in authors or () if a not in known]
+        return problems
+
+
+VALIDATOR = Validator()
+
+
+# --- Pending Changes ---
+class _Inotify:
+    """Recursive inotify watch over directory trees (Linux only, through libc)."""
+
+    MASK = 0x2 | 0x4 | 0x8 | 0x40 | 0x80 | 0x100 | 0x200  # modify, attrib, close_write, moves, create, delete
+    IN_Q_OVERFLOW = 0x4000
+    IN_IGNORED = 0x8000
+    IN_ISDIR = 0x40000000
+    IN_CREATE_OR_MOVED_TO = 0x100 | 0x80
+    HEADER = struct.Struct("iIII")
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+        self._ctypes = ctypes
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs = {}  # watch descriptor -> directory
+
+    def watch(self, path):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), self.MASK)
+        if wd < 0:
+            raise OSError(self._ctypes.get_errno(), f"cannot watch {path}")
+        self._dirs[wd] = str(path)
+
+    def watch_tree(self, top):
+        for dirpath, dirnames, _ in os.walk(top):
+            self.watch(dirpath)
+
+    def read(self):
+        """[(path, new directory?)] for pending events; raises OverflowError if events were lost."""
+        try:
+            data = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return []
+        events, offset = [], 0
+        while offset < len(data):
+            wd, mask, _, size = self.HEADER.unpack_from(data, offset)
+            name = data[offset + self.HEADER.size:offset + self.HEADER.size + size].rstrip(b"\0")
+            offset += self.HEADER.size + size
+            if mask & self.IN_Q_OVERFLOW:
+                raise OverflowError("inotify queue overflowed")
+            if mask & self.IN_IGNORED:
+                self._dirs.pop(wd, None)
+            elif wd in self._dirs:
+                path = os.path.join(self._dirs[wd], os.fsdecode(name)) if name else self._dirs[wd]
+                events.append((path, bool(mask & self.IN_ISDIR and mask & self.IN_CREATE_OR_MOVED_TO)))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class ChangeWatcher:
+    """Pending changes under content/ and data/ of one working tree.
+
+    The first refresh runs `git status --porcelain=v2` scoped to those
+    directories, with the untracked cache on and submodules ignored. After
+    that, inotify events name the paths to re-check and only those are given
+    to git as pathspecs. A refresh with no edits costs no subprocess, and one
+    after edits scales with the edited files, not with the repository.
+    Commits and resets, which change the index rather than the files, show up
+    as a new index mtime and trigger a scoped full status again. Without
+    inotify (other OSes, or out of watches) every refresh is a scoped full
+    status.
+    """
+
+    def __init__(self, root, scopes=PENDING_CHANGES_PATHS):
+        self.root = Path(root)
+        self.scopes = list(scopes)
+        self.generation = 0
+        self._changes = None  # path -> porcelain XY code; None until the next full status
+        self._dirty = set()
+        self._index = self.root / run_git("rev-parse", "--git-path", "index", cwd=root).strip()
+        self._index_mtime = None
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        try:
+            self._inotify = _Inotify()
+            self._inotify.watch(self.root)  # to notice content/ or data/ being created
+            for scope in self.scopes:
+                if (self.root / scope).is_dir():
+                    self._inotify.watch_tree(self.root / scope)
+        except (OSError, AttributeError) as e:
+            print(f"Watching {root} without inotify: {e}")
+            if getattr(self, "_inotify", None) is not None:
+                self._inotify.close()
+            self._inotify = None
+        else:
+            threading.Thread(target=self._watch, name=f"watch-{self.root.name}", daemon=True).start()
+
+    def _watch(self):
+        while not self._closed.is_set():
+            try:
+                if not select.select([self._inotify.fd], [], [], 1.0)[0]:
+                    continue
+            except (OSError, ValueError):
+                break  # closed
+            try:
+                events = self._inotify.read()
+            except (OverflowError, OSError):
+                with self._lock:
+                    self._changes = None
+                continue
+            for path, new_dir in events:
+                rel = os.path.relpath(path, self.root)
+                if rel.split(os.sep, 1)[0] not in self.scopes:
+                    continue
+                if new_dir:
+                    try:
+                        self._inotify.watch_tree(path)
+                    except OSError:
+                        pass  # vanished already, or out of watches; the path is re-checked below anyway
+                with self._lock:
+                    self._dirty.add(Path(rel).as_posix())
+
+    def _status(self, pathspecs):
+        # status has no --pathspec-from-file; large batches of edits fall back to a full status
+        # -c rather than `git config`: a read-only panel must not rewrite the shared repository config
+        out = run_git("-c", "core.untrackedCache=true", "status", "--porcelain=v2", "-z", "--untracked-files=all", "--ignore-submodules=all",
+                      "--no-renames", "--", *pathspecs, cwd=self.root, env={"GIT_LITERAL_PATHSPECS": "1"})
+        changes = {}
+        for entry in out.split("\0"):
+            if entry.startswith("1 "):
+                fields = entry.split(" ", 8)
+                changes[fields[8]] = fields[1]
+            elif entry.startswith("u "):
+                fields = entry.split(" ", 10)
+                changes[fields[10]] = fields[1]
+            elif entry.startswith("? "):
+                changes[entry[2:]] = "??"
+        return changes
+
+    def _index_stamp(self):
+        try:
+            return self._index.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def changes(self):
+        """{path: porcelain v2 XY code} of the files changed in the watched directories."""
+        with self._lock:
+            if self._inotify is None or self._index_stamp() != self._index_mtime:
+                self._changes = None
+            if self._changes is None or len(self._dirty) > PENDING_PATHSPECS_MAX:
+                self._dirty.clear()
+                changes = self._status(self.scopes)
+            elif self._dirty:
+                pathspecs, self._dirty = sorted(self._dirty), set()
+                found = self._status(pathspecs)
+                changes = {path: code for path, code in self._changes.items()
+                           if not any(path == p or path.startswith(p + "/") for p in pathspecs)}
+                changes.update(found)
+            else:
+                return self._changes
+            # status may have refreshed the index, so its mtime is taken afterwards
+            self._index_mtime = self._index_stamp()
+            if changes != self._changes:
+                self.generation += 1
+            self._changes = changes
+            return changes
+
+    def diff(self, path):
+        """Diff of one pending file against HEAD; new files are shown in full."""
+        code = self.changes().get(path)
+        if code is None:
+            return ""
+        if code == "??":
+            out = run_git("diff", "--no-index", "--", os.devnull, path, cwd=self.root, check=False)
+        else:
+            out = run_git("diff", "HEAD", "--", path, cwd=self.root)
+        if len(out) > PENDING_DIFF_MAX_BYTES:
+            out = out[:PENDING_DIFF_MAX_BYTES] + "\n… diff truncated"
+        return out
+
+    def close(self):
+        self._closed.set()
+        if self._inotify is not None:
+            self._inotify.close()
+
+
+_watchers = OrderedDict()  # working tree -> ChangeWatcher, least recently used first
+_watchers_lock = threading.Lock()
+
+def change_watcher(root):
+    with _watchers_lock:
+        watcher = _watchers.get(str(root))
+        if watcher is None:
+            watcher = _watchers[str(root)] = ChangeWatcher(root)
+            while len(_watchers) > WORKTREE_MAX + 1:
+                _, evicted = _watchers.popitem(last=False)
+                evicted.close()
+        _watchers.move_to_end(str(root))
+        return watcher
 
-# Ensure directories exist
-for path in [CONTENT_AUTHORS_PATH, DATA_AUTHORS_PATH, CONTENT_BLOG_PATH]:
-    path.mkdir(parents=True, exist_ok=True)
 
 # --- Helper Functions ---
-def list_authors():
-    return sorted([p.name for p in CONTENT_AUTHORS_PATH.iterdir() if p.is_dir()])
+def list_authors(index=None):
+    return (AUTHORS if index is None else index).names()
+
+def session_authors(request):
+    """Authors as seen by this session: its worktree's if it has one, which includes authors it created."""
+    tree = WORKTREES.current(request.session_hash) if request is not None else None
+    return AUTHORS if tree is None else author_index(tree)
 
 def format_author_name(name: str):
     return name.strip().replace(" ", "-").lower()
 
+def author_choices(selected=None, query="", index=None):
+    """Dropdown choices for `query`, always including the selected author."""
+    choices = (AUTHORS if index is None else index).search(query)
+    if selected and selected not in choices:
+        choices = [selected] + choices[:AUTHOR_DROPDOWN_LIMIT - 1]
+    return choices
+
 def get_project_repo_name():
     """Get the name of the repository inside /project folder."""
     project_path = Path("/project")
@@ -51,109 +2126,303 @@ def get_project_repo_name():
         # No directories found
         return "developer-portal-fork-test"  # fallback
 
+# --- Templates ---
+def render_author_files(name, bio="", image=""):
+    """Files for a new author, keyed by path relative to the repo root."""
+    return {
+        f"content/authors/{name}/_index.md": f"---\ntitle: {json.dumps(name, ensure_ascii=False)}\n---\n",
+        f"data/authors/{name}.json": json.dumps({"name": name, "bio": bio, "image": image}, indent=2),
+    }
+
+def render_article_index(title, authors, date, summary=DEFAULT_SUMMARY, tags=DEFAULT_TAGS):
+    # JSON strings are valid double-quoted YAML scalars, with quotes and backslashes escaped
+    quote = functools.partial(json.dumps, ensure_ascii=False)
+    authors_yaml = "".join(f'\n  - {quote(a)}' for a in authors)
+    tags_yaml = ", ".join(quote(t) for t in tags)
+    return f"""---
+title: {quote(title)}
+date: {quote(date)}
+summary: {quote(summary)}
+authors:{authors_yaml}
+tags: [{tags_yaml}]
+---
+"""
+
+# --- Author Images ---
+def _render_image_variants(src, dest_dir, digest, sizes, quality, max_pixels):
+    """Write square `<digest>-<size>.webp` variants of `src`; runs in the image worker processes."""
+    from PIL import Image, ImageOps
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    largest = max(sizes)
+    with Image.open(src) as img:
+        img.draft("RGB", (largest, largest))  # JPEGs are decoded at the smallest scale that still fits
+        img = ImageOps.exif_transpose(img)
+        img = img.convert("RGBA" if "A" in img.getbands() or img.mode == "P" else "RGB")
+    side = min(img.size)
+    left, top = (img.width - side) // 2, (img.height - side) // 2
+    img = img.crop((left, top, left + side, top + side))
+    for size in sizes:
+        variant = img.resize((min(size, side),) * 2, Image.LANCZOS)
+        tmp = Path(dest_dir) / f".{digest}-{size}.webp.tmp"
+        variant.save(tmp, "WEBP", quality=quality, method=4)
+        os.replace(tmp, Path(dest_dir) / f"{digest}-{size}.webp")
+
+
+class AuthorImages:
+    """Uploaded author photos turned into small WebP variants, stored by content hash.
+
+    An upload is hashed in fixed-size chunks, so memory does not grow with the
+    file size. The variants are generated once per distinct image in a
+    process pool and kept in `cache_path`; adding the same image to another
+    author or worktree only copies the small variants into the tree.
+    """
+
+    CHUNK = 1 << 20
+
+    def __init__(self, cache_path=IMAGE_CACHE_PATH, workers=IMAGE_WORKERS, sizes=AUTHOR_IMAGE_SIZES):
+        self.cache_path = Path(cache_path)
+        self.workers = workers
+        self.sizes = tuple(sizes)
+        self._pool = None
+        self._locks = {}  # digest -> Lock, so concurrent uploads of one image convert it once
+        self._lock = threading.Lock()
+
+    def digest(self, src):
+        """Content hash of an upload, read in chunks."""
+        sha = hashlib.sha256()
+        size = 0
+        with open(src, "rb") as f:
+            while chunk := f.read(self.CHUNK):
+                size += len(chunk)
+                if size > AUTHOR_IMAGE_MAX_BYTES:
+                    raise ValueError(f"image is larger than {AUTHOR_IMAGE_MAX_BYTES >> 20} MB")
+                sha.update(chunk)
+        return sha.hexdigest()[:20]
+
+    def _names(self, digest):
+        return [f"{digest}-{size}.webp" for size in self.sizes]
+
+    def convert(self, src):
+        """Digest of `src`, with its variants in the cache; converts only unseen images."""
+        digest = self.digest(src)
+        with self._lock:
+            lock = self._locks.setdefault(digest, threading.Lock())
+        with lock:
+            if all((self.cache_path / name).exists() for name in self._names(digest)):
+                METRICS.inc("author_images_total", result="cached")
+                return digest
+            self.cache_path.mkdir(parents=True, exist_ok=True)
+            with self._lock:
+                if self._pool is None:
+                    import multiprocessing
+                    self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            try:
+                with span("image convert"):
+                    self._pool.submit(_render_image_variants, str(src), str(self.cache_path), digest, self.sizes,
+                                      AUTHOR_IMAGE_QUALITY, AUTHOR_IMAGE_MAX_PIXELS).result()
+            except BrokenProcessPool:
+                self.close()  # a worker died (e.g. killed for memory); start a fresh pool next time
+                raise
+            METRICS.inc("author_images_total", result="converted")
+        with self._lock:
+            self._locks.pop(digest, None)
+        return digest
+
+    def install(self, src, root):
+        """Put the variants of `src` into the tree at `root`; returns the `image` field value."""
+        digest = self.convert(src)
+        dest = Path(root) / AUTHOR_IMAGE_DIR
+        dest.mkdir(parents=True, exist_ok=True)
+        for name in self._names(digest):
+            if not (dest / name).exists():
+                shutil.copyfile(self.cache_path / name, dest / name)
+        return f"{Path(AUTHOR_IMAGE_DIR).relative_to('assets')}/{digest}-{AUTHOR_IMAGE_FIELD_SIZE}.webp"
+
+    def variant_paths(self, image_field):
+        """Repo-relative paths of every variant behind an `image` field written by install()."""
+        digest, _, size = Path(image_field).stem.rpartition("-")
+        if Path(image_field).parent != Path(AUTHOR_IMAGE_DIR).relative_to("assets") or not digest or not size.isdigit():
+            return []  # not one of ours, e.g. an image committed by hand
+        return [Path(AUTHOR_IMAGE_DIR) / name for name in self._names(digest)]
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+
+AUTHOR_IMAGES = AuthorImages()
+
+
 # --- Author Functions ---
-def create_author(name):
+@traced
+def create_author(name, image=None, request: gr.Request = None):
     if not name or not name.strip():
         return "❌ Please enter a valid author name.", gr.update(), gr.update()
     
     name_formatted = format_author_name(name)
-    author_dir = CONTENT_AUTHORS_PATH / name_formatted
+    root = session_tree(request)
+    content_authors_path, data_authors_path, _ = tree_paths(root)
+    author_dir = content_authors_path / name_formatted
     author_dir.mkdir(parents=True, exist_ok=True)
+    data_authors_path.mkdir(parents=True, exist_ok=True)
     
-    (author_dir / "_index.md").write_text(f"---\ntitle: {name_formatted}\n---\n")
-    (DATA_AUTHORS_PATH / f"{name_formatted}.json").write_text(
-        json.dumps({"name": name_formatted, "bio": "", "image": ""}, indent=2)
-    )
+    image_field, image_msg = "", ""
+    if image:
+        try:
+            image_field = AUTHOR_IMAGES.install(image, root)
+            image_msg = f" Image: {image_field}"
+        except Exception as e:
+            image_msg = f" ⚠️ Image not added: {e}"
+    files = render_author_files(name_formatted, image=image_field)
+    with span("file write"):
+        (author_dir / "_index.md").write_text(files[f"content/authors/{name_formatted}/_index.md"])
+        (data_authors_path / f"{name_formatted}.json").write_text(files[f"data/authors/{name_formatted}.json"])
     
-    authors = list_authors()
-    status_msg = f"✅ Author '{name_formatted}' created! ({len(authors)} total)"
-    update_choices = gr.update(choices=authors, value=name_formatted)
+    index = author_index(root)
+    authors = list_authors(index)
+    status_msg = f"✅ Author '{name_formatted}' created! ({len(authors)} total){image_msg}"
+    update_choices = gr.update(choices=author_choices(name_formatted, index=index), value=name_formatted)
     return status_msg, update_choices, update_choices
 
-def refresh_authors(default_author="espressif"):
-    authors = list_authors()
+@traced
+def refresh_authors(default_author="espressif", request: gr.Request = None):
+    index = session_authors(request)
+    authors = list_authors(index)
     status_msg = f"🔄 Refreshed! ({len(authors)} authors)"
     # Use default_author if exists, else first author
-    value = default_author if default_author in authors else (authors[0] if authors else None)
-    update_choices = gr.update(choices=authors, value=value)
+    value = default_author if default_author in index else (authors[0] if authors else None)
+    update_choices = gr.update(choices=author_choices(value, index=index), value=value)
     return status_msg, update_choices, update_choices
 
+@traced
+def author_articles(author):
+    """Markdown list of an author's existing articles, from the content index."""
+    if not author:
+        return ""
+    rows = CONTENT_INDEX.articles_by_author(author)
+    if not rows:
+        return f"No articles by **{author}** yet."
+    lines = [f"**{author}** has {len(rows)} article(s):"]
+    lines += [f"- {date[:10]} · {title} (`{path}`)" for path, title, date in rows[:50]]
+    return "\n".join(lines)
+
+@traced
+def search_authors(key_up_data: gr.KeyUpData, request: gr.Request = None):
+    """Server-side typeahead for the author dropdown."""
+    return gr.update(choices=author_choices(query=key_up_data.input_value, index=session_authors(request)))
+
 
 # --- Article Function ---
-def create_article(title, author_name, pat, email, terminal):
-    terminal += "Starting create_article\n"
+def slug_in_use(root, slug, branch):
+    """Where `slug` is already used: the content index (main), the working tree, or `branch`; None if free."""
+    existing = CONTENT_INDEX.find_slug(slug)
+    if existing:
+        return existing[0]
+    _, _, content_blog_path = tree_paths(root)
+    # slugify() output has no glob metacharacters
+    in_tree = next(content_blog_path.glob(f"*/*/{slug}"), None)
+    if in_tree is not None:
+        return str(in_tree.relative_to(root))
+    if run_git("rev-parse", "-q", "--verify", f"refs/heads/{branch}", cwd=root, check=False).strip():
+        return f"branch {branch}"
+    return None
+
+def _create_article_job(job, title, author_name, pat, email, request):
+    job.report("Starting create_article")
+    state = session_state(request)
     if not pat:
-        load_dotenv(override=True)
-        pat = os.getenv('GITHUB_PAT')
+        pat = state.pat
         if not pat:
-            terminal += "No PAT found\n"
-            return "❌ No PAT provided in UI or .env", gr.update(), gr.update(visible=False), gr.update(visible=False), terminal
+            job.report("No PAT found")
+            return "❌ No PAT provided in UI or .env", gr.update(), gr.update(visible=False), gr.update(visible=False)
     
     if not title or not author_name:
-        terminal += "Missing title or author\n"
-        return "❌ Please provide both title and author.", gr.update(), gr.update(visible=False), gr.update(visible=False), terminal
+        job.report("Missing title or author")
+        return "❌ Please provide both title and author.", gr.update(), gr.update(visible=False), gr.update(visible=False)
     
     # Handle email
     if email:
-        commit_email = email
-        set_key('.env', 'USER_EMAIL', email)
-        terminal += f"Using email from UI: {email}\n"
+        commit_email = state.email = email
+        STATE.remember('USER_EMAIL', email)
+        job.report(f"Using email from UI: {email}")
     else:
-        load_dotenv(override=True)
-        commit_email = os.getenv('USER_EMAIL')
+        commit_email = state.email
         if not commit_email:
-            terminal += "No email found\n"
-            return "❌ No email provided in UI or .env", gr.update(), gr.update(visible=False), gr.update(visible=False), terminal
-        terminal += f"Using email from .env: {commit_email}\n"
+            job.report("No email found")
+            return "❌ No email provided in UI or .env", gr.update(), gr.update(visible=False), gr.update(visible=False)
+        job.report(f"Using email from .env: {commit_email}")
+    
+    # Work in this session's own worktree so concurrent users don't collide
+    clone_or_open_repo(pat)
+    root = session_tree(request)
+    content_authors_path, data_authors_path, content_blog_path = tree_paths(root)
+    job.report(f"Working tree: {root}")
     
+    # The dropdown accepts typed text; only existing authors may go into `authors:`
+    author_formatted = format_author_name(author_name)
+    if author_formatted not in author_index(root):
+        job.report(f"Unknown author: {author_name}")
+        return f"❌ Author '{author_name}' does not exist. Create it first or pick one from the list.", gr.update(), gr.update(visible=False), gr.update(visible=False)
+
     now = datetime.now()
     y, m = now.strftime("%Y"), now.strftime("%m")
     article_slug = slugify(title)
-    article_dir = CONTENT_BLOG_PATH / y / m / article_slug
+    branch_name = f"article/{slugify(title, separator='_')}"
+    # Checked before anything is written, so an existing article is never overwritten
+    existing = slug_in_use(root, article_slug, branch_name)
+    if existing:
+        job.report(f"Slug already used by {existing}")
+        return f"❌ An article with slug '{article_slug}' already exists: {existing}", gr.update(), gr.update(visible=False), gr.update(visible=False)
+    article_dir = content_blog_path / y / m / article_slug
     article_dir.mkdir(parents=True, exist_ok=True)
-    set_key('.env', 'ARTICLE_FOLDER', str(article_dir))  # Add ARTICLE_FOLDER to .env
-    set_key('.env', 'ARTICLE_TITLE', title)  # Add ARTICLE_TITLE to .env
-    terminal += f"Created article dir: {article_dir}\n"
+    state.article_folder = str(article_dir)
+    state.article_title = title
+    job.report(f"Created article dir: {article_dir}")
     
     # Format date as YYYY-MM-DD only
     date_only = now.strftime("%Y-%m-%d")
     
-    author_formatted = format_author_name(author_name)
-    
-    (article_dir / "index.md").write_text(f"""---
-title: "{title}"
-date: "{date_only}"
-summary: "This article explains many useful things."
-authors:
-  - "{author_formatted}"
-tags: ["ESP-IDF"]
----
-""")
-    terminal += "Wrote index.md\n"
+    with span("file write"):
+        (article_dir / "index.md").write_text(render_article_index(title, [author_formatted], date_only))
+    job.report("Wrote index.md")
     
-    # Create branch and add file
-    #try:
-    repo = clone_or_open_repo(pat)
-    g = Github(auth=Auth.Token(pat))
-    user = g.get_user()
-    author_actor = Actor(user.login, commit_email or user.email or f"{user.login}@users.noreply.github.com")
-    repo.git.checkout('main')
-    branch_name = f"article/{slugify(title, separator='_')}"
-    repo.git.checkout('HEAD', b=branch_name)
-    repo.git.add(str(article_dir))
-    repo.git.add(str(DATA_AUTHORS_PATH))
-    repo.git.add(str(CONTENT_AUTHORS_PATH))
-    repo.index.commit(f"{title} first commit", author=author_actor)
-    terminal += f"Created branch {branch_name} and committed\n"
-    #except Exception as e:
-     #   print(f"Error creating branch and committing article: {e}")
+    # Create branch and commit only the new files, without a checkout
+    user = get_github_client(pat).user()
+    login = user["login"]
+    author_actor = git.Actor(login, commit_email or user.get("email") or f"{login}@users.noreply.github.com")
+    new_files = [article_dir / "index.md",
+                 content_authors_path / author_formatted / "_index.md",
+                 data_authors_path / f"{author_formatted}.json"]
+    try:
+        image_field = json.loads(new_files[-1].read_text()).get("image") or ""
+    except (OSError, ValueError, AttributeError):
+        image_field = ""
+    # The author's photo variants, installed by create_author, go on the branch with the data file
+    new_files += [root / p for p in AUTHOR_IMAGES.variant_paths(image_field)]
+    new_files = [f.relative_to(root) for f in new_files if f.exists()]
+    commit, base_sha = commit_files(root, branch_name, new_files, f"{title} first commit", author_actor)
+    try:
+        attach_branch(root, branch_name, base_sha)
+    except git.GitCommandError as e:
+        # Undo the ref and the article so a retry does not find the slug taken
+        run_git("update-ref", "-d", f"refs/heads/{branch_name}", commit, cwd=root, check=False)
+        shutil.rmtree(article_dir, ignore_errors=True)
+        state.article_folder = state.article_title = ""
+        job.report(f"Could not switch to {branch_name}: {e.stderr.strip()}", "ERROR")
+        return f"❌ Could not switch the working tree to {branch_name}; nothing was created.", gr.update(), gr.update(visible=False), gr.update(visible=False)
+    state.branch = branch_name
+    job.report(f"Created branch {branch_name} and committed")
     
     # Get repository name from /project folder
     repo_name = get_project_repo_name()
-    terminal += f"Detected repo name: {repo_name}\n"
+    job.report(f"Detected repo name: {repo_name}")
     
-    vscode_link = f"{CODE_SERVER_BASE}?folder=/project/{repo_name}/content/blog/{y}/{m}/{article_slug}"
-    preview_link = f"http://localhost:1313/blog/{y}/{m}/{article_slug}/"
+    article_rel = article_dir.relative_to(root)
+    vscode_folder = f"/project/{repo_name}/{article_rel}" if root == CLONE_PATH else f"{root}/{article_rel}"
+    vscode_link = f"{CODE_SERVER_BASE}?folder={vscode_folder}"
+    preview_link = f"/preview/{PREVIEWS.register(article_dir)}/"
     
     # Generate branch name for UI
     ui_branch_name = f"add/{article_slug}"
@@ -209,34 +2478,502 @@ tags: ["ESP-IDF"]
     </div>
     """
     
-    return status_msg, gr.update(value=ui_branch_name), vscode_msg, preview_msg, terminal
+    return status_msg, gr.update(value=ui_branch_name), vscode_msg, preview_msg
+
+def create_article(title, author_name, pat, email, log_cursor, request: gr.Request = None):
+    session_state(request).log.add_secret(pat)
+    yield from stream_job("network", _create_article_job, (title, author_name, pat, email, request), log_cursor, 4, request)
+
+def _hugo_build_job(job, request):
+    """Full Hugo build of the session's working tree, served under /hugo/<site>/."""
+    article_folder = session_state(request).article_folder
+    if not article_folder:
+        return "❌ Create an article first"
+    hugo = shutil.which(HUGO_BIN)
+    if hugo is None:
+        return f"❌ `{HUGO_BIN}` is not installed here; use the instant preview"
+    root = session_tree(request)
+    ensure_submodules(root, job.report)
+    site = PREVIEWS.register_site(root)
+    host = request.headers.get("host", "localhost:7860") if request else "localhost:7860"
+    job.report(f"Building {root} with Hugo")
+    with span("hugo build"):
+        result = subprocess.run([hugo, "--source", str(root), "--destination", str(PREVIEW_BUILD_ROOT / site),
+                                 "--baseURL", f"http://{host}/hugo/{site}/", "--buildDrafts", "--buildFuture",
+                                 "--cleanDestinationDir", "--quiet"], capture_output=True, text=True)
+    if result.returncode != 0:
+        job.report(result.stderr.strip(), "ERROR")
+        return f"❌ Hugo build failed: {result.stderr.strip().splitlines()[-1] if result.stderr.strip() else result.returncode}"
+    page = Path(article_folder).relative_to(Path(root) / "content").as_posix()
+    return f"✅ Hugo build ready: [open the article](/hugo/{site}/{page}/)"
+
+def hugo_build(log_cursor, request: gr.Request = None):
+    yield from stream_job("disk", _hugo_build_job, (request,), log_cursor, 1, request)
+
+def _prepare_preview_job(job, request):
+    """Check out the theme submodules Hugo needs, in the served clone and the session's tree."""
+    if not (CLONE_PATH / ".git").exists():
+        return "❌ Clone the repository first"
+    trees = dict.fromkeys([CLONE_PATH, session_tree(request)])
+    count = sum(ensure_submodules(tree, job.report) for tree in trees)
+    return f"✅ Preview ready ({count} submodule(s) checked out)" if count else "✅ Preview ready"
+
+def prepare_preview(log_cursor, request: gr.Request = None):
+    yield from stream_job("network", _prepare_preview_job, (request,), log_cursor, 1, request)
+
+# --- Article Preview ---
+SHORTCODE_RE = re.compile(r"\{\{([<%])\s*(/?)\s*([\w./-]+)(.*?)\s*[>%]\}\}", re.S)
+HEADING_RE = re.compile(r" {0,3}#{1,6}(?:[ \t]|$)")
+FENCE_RE = re.compile(r" {0,3}(`{3,}|~{3,})")
+LINK_REFERENCE_RE = re.compile(r"^ {0,3}\[[^\]]+\]:", re.M)
+# Raw HTML is not rendered, so shortcodes go through Markdown as private-use markers
+# around their hex-encoded label and become HTML afterwards
+_SC_OPEN, _SC_CLOSE, _SC_INLINE, _SC_END = "\ue000", "\ue001", "\ue002", "\ue003"
+_SC_MARKERS = str.maketrans("", "", _SC_OPEN + _SC_CLOSE + _SC_INLINE + _SC_END)
+_SC_BLOCK_RE = re.compile(f"(?:<p>)?{_SC_OPEN}([0-9a-f]*){_SC_END}(?:</p>)?")
+_SC_CLOSE_RE = re.compile(f"(?:<p>)?{_SC_CLOSE}(?:</p>)?")
+_SC_INLINE_RE = re.compile(f"{_SC_INLINE}([0-9a-f]*){_SC_END}")
+
+def render_shortcodes(body):
+    """Replace Hugo shortcodes with markers; Markdown inside paired ones still renders."""
+    body = body.translate(_SC_MARKERS)
+    paired = {m.group(3) for m in SHORTCODE_RE.finditer(body) if m.group(2)}
+
+    def placeholder(match):
+        _, closing, name, args = match.groups()
+        if closing:
+            return f"\n\n{_SC_CLOSE}\n\n"
+        label = f"{name} {args.strip()}".strip().encode().hex()
+        if name in paired:
+            # On a paragraph of its own, so the content up to the closing tag is parsed as Markdown
+            return f"\n\n{_SC_OPEN}{label}{_SC_END}\n\n"
+        return f"{_SC_INLINE}{label}{_SC_END}"
+
+    return SHORTCODE_RE.sub(placeholder, body)
+
+# The preview runs in the app's origin, so it only runs its own nonce-tagged script. Files from page
+# bundles and Hugo builds are sandboxed into an opaque origin, so their scripts (if any) cannot reach the app.
+PREVIEW_CSP = ("default-src 'self'; img-src 'self' data: https:; style-src 'self' 'unsafe-inline'; "
+               "script-src 'nonce-{nonce}'; object-src 'none'; base-uri 'self'; form-action 'none'")
+BUNDLE_CSP = "sandbox; default-src 'none'; img-src 'self' data:; media-src 'self'; style-src 'unsafe-inline'"
+HUGO_CSP = "sandbox allow-scripts allow-popups"
+
+def shortcode_html(rendered):
+    """Turn the markers left by `render_shortcodes` in rendered HTML into labelled placeholders."""
+    def label(match):
+        return html.escape(bytes.fromhex(match.group(1)).decode("utf-8", "replace"))
+
+    rendered = _SC_BLOCK_RE.sub(lambda m: f'<div class="shortcode"><span class="shortcode-label">{label(m)}</span>',
+                                rendered)
+    rendered = _SC_CLOSE_RE.sub("</div>", rendered)
+    return _SC_INLINE_RE.sub(lambda m: f'<span class="shortcode">{label(m)}</span>', rendered)
+
+def markdown_sections(body):
+    """Split Markdown at headings outside fenced code; each part renders on its own.
+
+    Reference-style link definitions apply to the whole document, so a body
+    using them is returned as a single section.
+    """
+    if LINK_REFERENCE_RE.search(body):
+        return [body]
+    sections, current, fence = [], [], None
+    for line in body.splitlines(keepends=True):
+        match = FENCE_RE.match(line)
+        if fence is None and match:
+            fence = match.group(1)
+        elif fence and match and match.group(1)[0] == fence[0] and len(match.group(1)) >= len(fence):
+            fence = None
+        elif fence is None and current and HEADING_RE.match(line):
+            sections.append("".join(current))
+            current = []
+        current.append(line)
+    if current:
+        sections.append("".join(current))
+    return sections
+
+
+class ArticlePreviews:
+    """Instant previews of single articles, rendered in the manager process.
+
+    An article's index.md is rendered on its own: front matter header, Markdown
+    body and shortcode placeholders, with no theme or site build. Output is
+    cached by the file's content hash, and an unchanged file (same mtime and
+    size) is not even read again, so polling an open preview costs one stat().
+    The body is rendered section by section with its own cache, so after an
+    edit only the section that changed goes through the Markdown parser.
+    """
+
+    def __init__(self, cache_size=PREVIEW_CACHE_SIZE, section_cache_size=PREVIEW_SECTION_CACHE_SIZE):
+        self.cache_size = cache_size
+        self.section_cache_size = section_cache_size
+        self._articles = {}  # token -> article directory
+        self._sites = {}  # token -> working tree built with Hugo
+        self._stamps = {}  # token -> ((mtime_ns, size), content hash)
+        self._cache = OrderedDict()  # content hash -> HTML
+        self._sections = OrderedDict()  # section hash -> HTML
+        self._markdown = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _token(path):
+        return hashlib.sha1(str(path).encode()).hexdigest()[:16]
+
+    def register(self, article_dir):
+        """Token under which the article is served at /preview/<token>/."""
+        article_dir = Path(article_dir).resolve()
+        token = self._token(article_dir)
+        with self._lock:
+            self._articles[token] = article_dir
+        return token
+
+    def register_site(self, root):
+        root = Path(root).resolve()
+        token = self._token(root)
+        with self._lock:
+            self._sites[token] = root
+        return token
+
+    def article(self, token):
+        with self._lock:
+            return self._articles.get(token)
+
+    def site(self, token):
+        with self._lock:
+            return token if token in self._sites else None
+
+    def _render(self, text):
+        if self._markdown is None:
+            from markdown_it import MarkdownIt
+            # No raw HTML: the preview is served from the app's own origin
+            self._markdown = MarkdownIt("commonmark", {"html": False}).enable(["table", "strikethrough"])
+        match = FRONT_MATTER_RE.match(text)
+        try:
+            meta = parse_front_matter(text)
+            header = ""
+        except ValueError as e:
+            meta = {}
+            header = f'<p class="error">⚠️ {html.escape(str(e))}</p>'
+        authors = meta.get("authors") or []
+        authors = [authors] if isinstance(authors, str) else authors
+        tags = meta.get("tags") or []
+        header += f"<h1>{html.escape(str(meta.get('title', 'Untitled')))}</h1>"
+        byline = " · ".join(part for part in (str(meta.get("date") or ""), ", ".join(map(str, authors))) if part)
+        if byline:
+            header += f'<p class="meta">{html.escape(byline)}</p>'
+        if meta.get("summary"):
+            header += f'<p class="summary">{html.escape(str(meta["summary"]))}</p>'
+        if tags:
+            header += '<p class="tags">' + "".join(f"<span>{html.escape(str(t))}</span>" for t in tags) + "</p>"
+        body = text[match.end():] if match else text
+        return header + "".join(self._render_section(section)
+                                for section in markdown_sections(render_shortcodes(body)))
+
+    def _render_section(self, text):
+        key = hashlib.sha1(text.encode()).digest()
+        with self._lock:
+            rendered = self._sections.get(key)
+            if rendered is not None:
+                self._sections.move_to_end(key)
+                return rendered
+        rendered = shortcode_html(self._markdown.render(text))
+        with self._lock:
+            self._sections[key] = rendered
+            while len(self._sections) > self.section_cache_size:
+                self._sections.popitem(last=False)
+        return rendered
+
+    def render(self, token):
+        """(content hash, HTML) of the article's current index.md.
+
+        Raises KeyError for an unknown token and OSError if the file is gone.
+        """
+        article = self.article(token)
+        if article is None:
+            raise KeyError(token)
+        index = article / "index.md"
+        stat = index.stat()
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            known = self._stamps.get(token)
+            if known and known[0] == stamp and known[1] in self._cache:
+                return known[1], self._cache[known[1]]
+        data = index.read_bytes()
+        digest = hashlib.sha1(data).hexdigest()
+        with self._lock:
+            rendered = self._cache.get(digest)
+        if rendered is None:
+            started = time.perf_counter()
+            rendered = self._render(data.decode("utf-8", "replace"))
+            METRICS.observe("preview_render_seconds", time.perf_counter() - started)
+        with self._lock:
+            self._cache[digest] = rendered
+            self._cache.move_to_end(digest)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            self._stamps[token] = (stamp, digest)
+        return digest, rendered
+
+
+PREVIEWS = ArticlePreviews()
+
+def preview_page(token, digest, body, nonce):
+    """Standalone page for /preview/<token>/; swaps in new HTML whenever the file is saved.
+
+    Its only script carries `nonce`, which PREVIEW_CSP must allow.
+    """
+    return f"""<!doctype html>
+<html>
+<head>
+<meta charset="utf-8">
+<base href="/preview/{token}/">
+<title>Preview</title>
+<style>
+  body {{ font-family: system-ui, sans-serif; max-width: 46rem; margin: 2rem auto; padding: 0 1rem; line-height: 1.6; color: #1a202c; }}
+  img {{ max-width: 100%; }}
+  pre {{ background: #f7fafc; padding: 0.75rem; overflow-x: auto; }}
+  .meta, #status {{ color: #718096; font-size: 0.9rem; }}
+  .summary {{ font-style: italic; }}
+  .tags span {{ background: #feebc8; border-radius: 4px; padding: 0 0.4rem; margin-right: 0.3rem; font-size: 0.85rem; }}
+  .shortcode {{ display: block; border: 1px dashed #dd6b20; border-radius: 6px; padding: 0.5rem; margin: 1rem 0; }}
+  span.shortcode {{ display: inline-block; margin: 0; padding: 0 0.4rem; }}
+  .shortcode-label {{ font-family: monospace; color: #c05621; font-size: 0.85rem; }}
+  .error {{ color: #c53030; }}
+</style>
+</head>
+<body>
+<main id="article">{body}</main>
+<footer id="status">Live preview: updates when index.md is saved</footer>
+<script nonce="{nonce}">
+  const source = new EventSource("/preview-events/{token}?since={digest}");
+  source.onmessage = (event) => {{
+    document.getElementById("article").innerHTML = JSON.parse(event.data).html;
+    document.getElementById("status").textContent = "Updated " + new Date().toLocaleTimeString();
+  }};
+  source.addEventListener("gone", () => {{
+    source.close();
+    document.getElementById("status").textContent = "The article is gone";
+  }});
+</script>
+</body>
+</html>
+"""
+
+
+# --- Bulk Import ---
+def _split_list(value):
+    if isinstance(value, list):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [v.strip() for v in str(value or "").replace(";", ",").split(",") if v.strip()]
+
+def load_manifest(path):
+    """Parse a YAML or CSV manifest into (authors, articles).
+
+    YAML has top-level `authors` (names or {name, bio}) and `articles` lists.
+    A CSV has one article per row with `title`, `authors`, `date`, `summary` and
+    `tags` columns. Authors referenced by an article that don't exist yet are
+    created either way.
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            raw_authors, raw_articles = [], list(csv.DictReader(f))
+    else:
+        import yaml  # only needed for manifests
+        data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+        raw_authors, raw_articles = data.get("authors") or [], data.get("articles") or []
+
+    authors = {}
+    for entry in raw_authors:
+        entry = entry if isinstance(entry, dict) else {"name": entry}
+        authors[format_author_name(str(entry["name"]))] = entry.get("bio", "")
+
+    today = datetime.now().strftime("%Y-%m-%d")
+    articles, errors = [], []
+    for i, entry in enumerate(raw_articles, start=1):
+        title = str(entry.get("title") or "").strip()
+        names = [format_author_name(a) for a in _split_list(entry.get("authors") or entry.get("author"))]
+        date = str(entry.get("date") or today)[:10]
+        if not title or not names:
+            errors.append(f"article {i}: title and authors are required")
+            continue
+        try:
+            datetime.strptime(date, "%Y-%m-%d")
+        except ValueError:
+            errors.append(f"article {i}: invalid date '{date}'")
+            continue
+        articles.append({
+            "title": title,
+            "slug": slugify(title),
+            "date": date,
+            "authors": names,
+            "summary": entry.get("summary") or DEFAULT_SUMMARY,
+            "tags": _split_list(entry.get("tags")) or DEFAULT_TAGS,
+        })
+        for name in names:
+            authors.setdefault(name, "")
+    if errors:
+        raise ValueError("Invalid manifest: " + "; ".join(errors))
+    return authors, articles
+
+def render_article_files(article):
+    y, m = article["date"][:4], article["date"][5:7]
+    path = f"content/blog/{y}/{m}/{article['slug']}/index.md"
+    return {path: render_article_index(article["title"], article["authors"], article["date"],
+                                       article["summary"], article["tags"])}
+
+def _fast_import_commit(branch, parent, files, message, actor, when):
+    """One commit in `git fast-import` stream format."""
+    ident = f"{actor.name} <{actor.email}> {when} +0000"
+    msg = message.encode()
+    out = [f"commit refs/heads/{branch}\nauthor {ident}\ncommitter {ident}\ndata {len(msg)}\n".encode(), msg,
+           f"\nfrom {parent}\n".encode()]
+    for path, content in files.items():
+        data = content.encode()
+        out += [f"M 100644 inline {path}\ndata {len(data)}\n".encode(), data, b"\n"]
+    return b"".join(out) + b"\n"
+
+def import_manifest(root, manifest, actor, per_article=False, base="main", report=print):
+    """Generate every file in `manifest` and commit it.
+
+    By default all files are written to the working tree at `root` and land in
+    one `git add` and one commit on the current branch, or on a new
+    `import/<timestamp>` branch if HEAD is detached. With `per_article`
+    each article gets its own `article/<slug>` branch off `base`, built by a
+    single `git fast-import` run without touching the working tree.
+    Articles whose slug is already taken, or whose generated files fail
+    validation, are skipped, never overwritten.
+    Returns a summary dict including articles/sec.
+    """
+    started = time.perf_counter()
+    authors, articles = load_manifest(manifest)
+    taken, fresh = set(), []
+    for article in articles:
+        path = next(iter(render_article_files(article)))
+        if article["slug"] in taken or (Path(root) / path).exists() or CONTENT_INDEX.find_slug(article["slug"]):
+            report(f"Skipping '{article['title']}': slug '{article['slug']}' is already used", "WARNING")
+        else:
+            fresh.append(article)
+        taken.add(article["slug"])
+    skipped_slugs, articles = len(articles) - len(fresh), fresh
+    new_authors = {name: bio for name, bio in authors.items()
+                   if not (Path(root) / "data/authors" / f"{name}.json").exists()}
+    report(f"Manifest: {len(articles)} articles, {len(new_authors)} new authors")
+
+    with ThreadPoolExecutor(max_workers=BULK_RENDER_WORKERS) as pool:
+        author_files = {}
+        for files in pool.map(lambda item: render_author_files(*item), new_authors.items()):
+            author_files.update(files)
+        article_files = list(pool.map(render_article_files, articles))
+        report(f"Rendered {len(author_files) + len(article_files)} files")
+
+        problems = VALIDATOR.check_files(author_files)
+        if problems:
+            raise ValueError("Generated author files are invalid: " + "; ".join(problems))
+        known = author_index(root).data_names() | new_authors.keys()
+        valid = []
+        for article, files in zip(articles, article_files):
+            problems = VALIDATOR.check_files(files, known)
+            if problems:
+                report(f"Skipping '{article['title']}': " + "; ".join(problems), "WARNING")
+            else:
+                valid.append((article, files))
+        invalid = len(articles) - len(valid)
+        articles, article_files = [a for a, _ in valid], [f for _, f in valid]
+
+        if per_article:
+            existing = set(run_git("for-each-ref", "--format=%(refname:short)", "refs/heads/article/", cwd=root).split())
+            parent = run_git("rev-parse", f"{base}^{{commit}}", cwd=root).strip()
+            when = int(time.time())
+            stream, branches, skipped = [], [], 0
+            for article, files in zip(articles, article_files):
+                branch = f"article/{slugify(article['title'], separator='_')}"
+                if branch in existing or branch in branches:
+                    skipped += 1
+                    continue
+                files = {**files, **{p: c for p, c in author_files.items()
+                                     if any(f"/{a}/" in p or p.endswith(f"/{a}.json") for a in article["authors"])}}
+                stream.append(_fast_import_commit(branch, parent, files, f"{article['title']} first commit", actor, when))
+                branches.append(branch)
+            run_git("fast-import", "--quiet", cwd=root, input=b"".join(stream))
+            commits = len(branches)
+            report(f"Created {commits} branches" + (f", skipped {skipped} existing" if skipped else ""))
+        else:
+            files = dict(author_files)
+            for f in article_files:
+                files.update(f)
+
+            def write(item):
+                path = Path(root) / item[0]
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(item[1])
+
+            head = run_git("rev-parse", "HEAD", cwd=root).strip()
+            if not run_git("symbolic-ref", "-q", "HEAD", cwd=root, check=False).strip():
+                branch = f"import/{datetime.now():%Y%m%d-%H%M%S}"
+                run_git("branch", branch, head, cwd=root)
+                attach_branch(root, branch, head)
+                report(f"Created branch {branch}")
+            list(pool.map(write, files.items()))
+            run_git("add", "--pathspec-from-file=-", cwd=root, input="\n".join(files) + "\n")
+            git.Repo(root).index.commit(f"Import {len(articles)} articles from manifest", author=actor)
+            commits = 1
+            report(f"Wrote {len(files)} files in one commit")
+
+    elapsed = time.perf_counter() - started
+    return {"articles": len(articles), "skipped": skipped_slugs, "invalid": invalid, "authors": len(new_authors), "commits": commits,
+            "seconds": elapsed, "articles_per_sec": len(articles) / elapsed if elapsed else 0.0}
+
+def _import_manifest_job(job, manifest, mode, pat, email, request):
+    if manifest is None:
+        return "❌ Please upload a manifest."
+    state = session_state(request)
+    pat = pat or state.pat
+    if not pat:
+        return "❌ No PAT provided in UI or .env"
+    clone_or_open_repo(pat)
+    root = session_tree(request)
+    user = get_github_client(pat).user()
+    login = user["login"]
+    actor = git.Actor(login, email or state.email or user.get("email") or f"{login}@users.noreply.github.com")
+    manifest_path = manifest if isinstance(manifest, str) else manifest.name
+    result = import_manifest(root, manifest_path, actor, per_article=(mode == "One branch per article"),
+                             report=job.report)
+    job.report(f"Import took {result['seconds']:.2f}s ({result['articles_per_sec']:.0f} articles/sec)")
+    skipped = f", skipped {result['skipped']} with a slug already in use" if result["skipped"] else ""
+    skipped += f", skipped {result['invalid']} that failed validation" if result["invalid"] else ""
+    return (f"✅ Imported {result['articles']} articles and {result['authors']} authors "
+            f"in {result['commits']} commit(s), {result['articles_per_sec']:.0f} articles/sec{skipped}")
+
+def bulk_import(manifest, mode, pat, email, log_cursor, request: gr.Request = None):
+    session_state(request).log.add_secret(pat)
+    yield from stream_job("disk", _import_manifest_job, (manifest, mode, pat, email, request), log_cursor, 1, request)
 
 # --- Git Functions ---
-def check_git_credentials(pat, email, terminal):
+def _check_git_credentials_job(job, pat, email, request):
+    state = session_state(request)
     if email:
-        set_key('.env', 'USER_EMAIL', email)
-        terminal += f"Saved email to .env: {email}\n"
+        state.email = email
+        if STATE.remember('USER_EMAIL', email):
+            job.report(f"Saved email to .env: {email}")
     
     if not pat:
-        load_dotenv(override=True)
-        pat = os.getenv('GITHUB_PAT')
+        pat = state.pat
         if not pat:
-            terminal += "No PAT in UI or .env\n"
-            return "❌ No PAT provided in UI or .env", "", "", terminal
+            job.report("No PAT in UI or .env")
+            return "❌ No PAT provided in UI or .env", "", ""
     else:
-        set_key('.env', 'GITHUB_PAT', pat)
-        terminal += "Saved PAT to .env\n"
+        state.pat = pat
+        job.report("Saved PAT to .env" if STATE.remember('GITHUB_PAT', pat) else "Using this PAT for this session")
     
-    terminal += f"Read PAT: {pat}\n"
+    job.report(f"Read PAT: {pat}", level="DEBUG")
     try:
-        g = Github(auth=Auth.Token(pat))
-        user = g.get_user()
-        username = user.login
-        terminal += f"Authenticated as: {username}\n"
+        client = get_github_client(pat)
+        username = client.user()["login"]
+        job.report(f"Authenticated as: {username}")
         
         # Extract repo full name from local repo if cloned
-        if CLONE_PATH.exists():
-            repo = Repo(CLONE_PATH)
+        if (CLONE_PATH / ".git").exists():
+            repo = git.Repo(CLONE_PATH)
             remote_url = repo.remote("origin").url
             parts = remote_url.rstrip('/').split('/')
             owner = parts[-2]
@@ -245,30 +2982,38 @@ def check_git_credentials(pat, email, terminal):
         else:
             repo_full_name = REPO_FULL_NAME  # Fallback if not cloned
         
-        repo = g.get_repo(repo_full_name)
-        permissions = repo.get_collaborator_permission(user.login)
+        client.repo(repo_full_name)
+        permissions = client.permission(repo_full_name, username)
         if permissions in ['admin', 'write']:
             status_msg = "✅ Credentials valid: Push and branch creation allowed."
         else:
             status_msg = "❌ Credentials valid but push and branch creation not allowed."
-        terminal += f"Repo: {repo_full_name}, Permissions: {permissions}\n"
-        return status_msg, repo_full_name, username, terminal
-    except GithubException as e:
+        job.report(f"Repo: {repo_full_name}, Permissions: {permissions}")
+        stats = client.stats()
+        job.report(f"GitHub cache: {stats['hits']} hits, {stats['misses']} misses, rate limit remaining: {stats['rate_limit_remaining']}")
+        return status_msg, repo_full_name, username
+    except github.GithubException as e:
         if e.status == 403:
-            terminal += f"403 error: {e}\n"
-            return "❌ Credentials valid but push and branch creation not allowed.", "", username, terminal
+            job.report(f"403 error: {e}")
+            return "❌ Credentials valid but push and branch creation not allowed.", "", username
         else:
-            terminal += f"GitHub error: {e}\n"
-            return f"❌ Check failed: {str(e)}", "", "", terminal
+            job.report(f"GitHub error: {e}")
+            return f"❌ Check failed: {str(e)}", "", ""
     except Exception as e:
-        terminal += f"General error: {e}\n"
-        return f"❌ Check failed: {str(e)}", "", "", terminal
+        job.report(f"General error: {e}")
+        return f"❌ Check failed: {str(e)}", "", ""
+
+def check_git_credentials(pat, email, log_cursor, request: gr.Request = None):
+    session_state(request).log.add_secret(pat)
+    yield from stream_job("network", _check_git_credentials_job, (pat, email, request), log_cursor, 3, request)
 
+@traced
 def fork_repo(pat):
     try:
-        g = Github(auth=Auth.Token(pat))
+        client = get_github_client(pat)
+        g = client.github
         user = g.get_user()
-        username = user.login
+        username = client.user()["login"]
         
         # Get today's date in YYYY-MM-DD format
         today = datetime.now().strftime("%Y-%m-%d")
@@ -276,263 +3021,607 @@ def fork_repo(pat):
         # Create custom fork name
         fork_name = f"developer_portal_{username}_{today}"
         
-        # Get the original repo
-        original_repo = g.get_repo(REPO_FULL_NAME)
-        
-        # Check if fork already exists with this name
-        existing_fork = None
-        for repo in user.get_repos():
-            if repo.name == fork_name and repo.fork:
-                existing_fork = repo
-                break
+        # Check if a fork already exists (GitHub allows one fork per owner)
+        existing_fork = resolve_fork(client, username, [fork_name])
         
         if existing_fork:
-            fork = existing_fork
-            status_msg = f"✅ Using existing fork: {fork.full_name}"
+            fork_full_name, fork_ssh_url = existing_fork["full_name"], existing_fork["ssh_url"]
+            status_msg = f"✅ Using existing fork: {fork_full_name}"
         else:
             # Create fork with custom name
+            original_repo = g.get_repo(REPO_FULL_NAME)
             fork = user.create_fork(original_repo, name=fork_name)
-            status_msg = f"✅ Created new fork: {fork.full_name}"
-        
-        # Clone the forked repo with recursive shallow submodules
-        if CLONE_PATH.exists():
-            # Remove existing clone if it exists
-            import shutil
-            shutil.rmtree(CLONE_PATH)
-        
-        # Clone with recursive and shallow-submodules
-        import subprocess
-        clone_cmd = ["git", "clone", "--recursive", "--shallow-submodules", fork.ssh_url, str(CLONE_PATH)]
-        result = subprocess.run(clone_cmd, capture_output=True, text=True)
+            fork_full_name, fork_ssh_url = fork.full_name, fork.ssh_url
+            remember_fork(username, fork_full_name, fork_ssh_url)
+            status_msg = f"✅ Created new fork: {fork_full_name}"
         
-        if result.returncode != 0:
-            return f"❌ Clone failed: {result.stderr}"
+        # Borrow objects from the shared upstream mirror, then clone (or refresh) the fork
+        try:
+            update_reference_cache()
+        except git.GitCommandError as e:
+            print(f"Reference cache not updated: {e}")
+        clone_repo(fork_ssh_url, CLONE_PATH)
+        # Themes are checked out on the first preview; fetch them now so that is quick
+        threading.Thread(target=warm_submodule_cache, daemon=True).start()
         
-        return f"{status_msg}\n✅ Cloned to {CLONE_PATH} with recursive shallow submodules"
+        return f"{status_msg}\n✅ Cloned to {CLONE_PATH}"
         
     except Exception as e:
         return f"❌ Fork failed: {str(e)}"
 
 def clone_or_open_repo(pat):
-    if CLONE_PATH.exists():
-        return Repo(CLONE_PATH)
-    g = Github(auth=Auth.Token(pat))
-    user = g.get_user()
-    repo_g = g.get_repo(REPO_FULL_NAME)
-    fork = next((f for f in user.get_repos() if f.full_name.endswith(repo_g.name)), None)
-    if not fork:
-        fork = user.create_fork(repo_g)
-    Repo.clone_from(fork.ssh_url, CLONE_PATH)
-    return Repo(CLONE_PATH)
-
-def create_branch(branch_name, pat):
+    if (CLONE_PATH / ".git").exists():
+        return git.Repo(CLONE_PATH)
+    client = get_github_client(pat)
+    login = client.user()["login"]
+    fork = resolve_fork(client, login, [REPO_FULL_NAME.split("/")[1]])
+    if fork:
+        ssh_url = fork["ssh_url"]
+    else:
+        g = client.github
+        created = g.get_user().create_fork(g.get_repo(REPO_FULL_NAME))
+        ssh_url = created.ssh_url
+        remember_fork(login, created.full_name, ssh_url)
+    clone_repo(ssh_url, CLONE_PATH)
+    return git.Repo(CLONE_PATH)
+
+@traced
+def create_branch(branch_name, pat, request: gr.Request = None):
     try:
-        repo = clone_or_open_repo(pat)
-        repo.git.checkout('main')
-        repo.git.checkout('HEAD', b=branch_name)
+        clone_or_open_repo(pat)
+        if request is not None and WORKTREES.reattach(request.session_hash, branch_name):
+            return f"✅ Reopened branch '{branch_name}' with its uncommitted changes."
+        root = session_tree(request)
+        run_git("branch", branch_name, "main", cwd=root)
+        attach_branch(root, branch_name, run_git("rev-parse", "main", cwd=root).strip())
+        if request is not None:
+            session_state(request).branch = branch_name
         return f"✅ Branch '{branch_name}' created."
     except Exception as e:
         return f"❌ Branch failed: {str(e)}"
 
-def commit_changes(message, pat, terminal):
-    print("Commit start")
+def _commit_changes_job(job, message, pat, request):
     try:
-        repo = clone_or_open_repo(pat)
-        load_dotenv(override=True)
-        article_folder = os.getenv('ARTICLE_FOLDER')
-        print(article_folder)
-        terminal += f"Article folder: {article_folder}\n"
+        clone_or_open_repo(pat)
+        root = session_tree(request)
+        repo = git.Repo(root)
+        content_authors_path, data_authors_path, _ = tree_paths(root)
+        article_folder = session_state(request).article_folder
+        job.report(f"Article folder: {article_folder}")
         if not article_folder or not os.path.exists(article_folder):
-            terminal += "Article folder does not exist\n"
-            return "❌ Article folder does not exist", terminal
-        repo.git.add(article_folder)
-        repo.git.add(str(DATA_AUTHORS_PATH))
-        repo.git.add(str(CONTENT_AUTHORS_PATH))
-        repo.index.commit(message)
-        terminal += f"Committed: {message}\n"
-        return f"✅ Committed: '{message}'", terminal
+            job.report("Article folder does not exist")
+            return "❌ Article folder does not exist"
+        problems = VALIDATOR.validate(root)
+        if problems:
+            for problem in problems:
+                job.report(problem, "ERROR")
+            return f"❌ Commit blocked by {len(problems)} problem(s):\n" + "\n".join(problems[:10])
+        paths = [article_folder, data_authors_path, content_authors_path]
+        if (Path(root) / AUTHOR_IMAGE_DIR).exists():
+            paths.append(Path(root) / AUTHOR_IMAGE_DIR)
+        for path in paths:
+            with span("git add"):
+                repo.git.add(str(path))
+        with span("git commit"):
+            repo.index.commit(message)
+        job.report(f"Committed: {message}")
+        return f"✅ Committed: '{message}'"
     except Exception as e:
-        terminal += f"Commit error: {e}\n"
-        return f"❌ Commit failed: {str(e)}", terminal
+        job.report(f"Commit error: {e}")
+        return f"❌ Commit failed: {str(e)}"
+
+def session_branch(root, request):
+    """The branch checked out in the session's worktree, or the one stored on the session if HEAD is detached."""
+    branch = run_git("symbolic-ref", "-q", "--short", "HEAD", cwd=root, check=False).strip()
+    branch = branch or (session_state(request).branch if request is not None else "")
+    if not branch:
+        raise RuntimeError("No branch to push: create an article or a branch first")
+    return branch
 
-def push_changes(branch_name, pat, message, terminal):
+def _push_changes_job(job, branch_name, pat, message, request):
+    """Queue a push of the session's current branch; the push itself runs in PUSHES."""
+    clone_or_open_repo(pat)
+    root = session_tree(request)
+    branch_name = session_branch(root, request)
+    return PUSHES.request(root, branch_name, log=job.log), branch_name
+
+def commit_changes(message, pat, log_cursor, request: gr.Request = None):
+    session_state(request).log.add_secret(pat)
+    yield from stream_job("disk", _commit_changes_job, (message, pat, request), log_cursor, 1, request)
+
+def push_changes(branch_name, pat, message, log_cursor, request: gr.Request = None):
+    """Queue the push and follow it for up to PUSH_WAIT_SECONDS; retries continue in the background."""
+    state = session_state(request)
+    state.log.add_secret(pat)
+    job = JOBS.submit("network", _push_changes_job, branch_name, pat, message, request,
+                      session_id=request.session_hash if request else None, log=state.log)
     try:
-        repo = clone_or_open_repo(pat)
-        load_dotenv(override=True)
-        title = os.getenv('ARTICLE_TITLE', 'article')
-        branch_name = repo.active_branch.name
-        repo.index.commit(f"added {title}")
-        origin = repo.remote(name='origin')
-        origin.push(refspec=f"{branch_name}:{branch_name}")
-        terminal += f"Pushed branch: {branch_name}\n"
-        return f"✅ Committed and pushed '{branch_name}'", terminal
+        ticket, branch_name = job.result()
     except Exception as e:
-        terminal += f"Push error: {e}\n"
-        return f"❌ Push failed: {str(e)}", terminal
+        state.log.write(f"Push error: {e}", "ERROR")
+        delta, log_cursor = state.log.delta(log_cursor, state.log_level)
+        yield f"❌ Push failed: {e}", log_cursor, delta
+        return
+    deadline = time.monotonic() + PUSH_WAIT_SECONDS
+    shown = None
+    while not ticket.wait(0.25) and time.monotonic() < deadline:
+        delta, log_cursor = state.log.delta(log_cursor, state.log_level)
+        if log_cursor != shown:
+            shown = log_cursor
+            yield f"⏳ Pushing '{branch_name}'…", log_cursor, delta
+    if ticket.done():
+        message = ticket.message
+    else:
+        message = f"⏳ '{branch_name}' is still being pushed in the background; the log shows when it is done"
+    delta, log_cursor = state.log.delta(log_cursor, state.log_level)
+    yield message, log_cursor, delta
+
+def pr_body(root, branch, base="main"):
+    """Default pull request description: the branch's commits and the article summaries it touches."""
+    log = run_git("log", "--format=- %s", f"{base}..{branch}", cwd=root).strip()
+    changed = run_git("diff", "--name-only", f"{base}...{branch}", "--", "content/blog", cwd=root).split()
+    articles = []
+    for path in sorted({p for p in changed if p.endswith("/index.md")}):
+        try:
+            front = parse_front_matter((Path(root) / path).read_text())
+        except (OSError, ValueError):
+            continue
+        articles.append(f"- **{front.get('title', path)}**: {front.get('summary', '')}")
+    sections = []
+    if articles:
+        sections.append("### Articles\n\n" + "\n".join(articles))
+    if log:
+        sections.append("### Commits\n\n" + log)
+    return "\n\n".join(sections)
+
+def _create_pr_job(job, title, description, pat, request):
+    """Push the session's branch and open a PR for it against REPO_FULL_NAME.
+
+    The push runs in PUSHES while the GitHub lookups and the PR body are
+    prepared. An open PR for the same head is looked up first and returned
+    as is, so retrying never creates a duplicate.
+    """
+    started = time.perf_counter()
+    clone_or_open_repo(pat)
+    root = session_tree(request)
+    branch = session_branch(root, request)
+    if branch == "main":
+        return "❌ Create a branch for your changes first"
+    ticket = PUSHES.request(root, branch, log=job.log)
+
+    client = get_github_client(pat)
+    login = client.user()["login"]
+    head = f"{login}:{branch}"
+    base = client.repo(REPO_FULL_NAME).get("default_branch", "main")
+    existing = client.open_pull(REPO_FULL_NAME, head)
+    title = title or session_state(request).article_title or branch
+    if existing is None and not description:
+        description = pr_body(root, branch, "main")
+    job.report(f"Prepared PR '{title}' from {head} in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    if not ticket.wait(PR_PUSH_TIMEOUT):
+        return f"❌ Push of '{branch}' is still retrying; create the PR once it is done"
+    if not ticket.ok:
+        return ticket.message
+
+    if existing is None:
+        try:
+            existing = client.create_pull(REPO_FULL_NAME, title, head, base, description)
+            job.report(f"Created PR #{existing['number']}")
+        except github.GithubException as e:
+            # 422 when a PR for this head appeared since the lookup, e.g. from a double click
+            existing = client.open_pull(REPO_FULL_NAME, head) if e.status == 422 else None
+            if existing is None:
+                raise
+    else:
+        job.report(f"PR #{existing['number']} is already open for {head}")
+    elapsed = time.perf_counter() - started
+    METRICS.observe("publish_duration_seconds", elapsed)
+    job.report(f"Published in {elapsed * 1000:.0f} ms")
+    return f"✅ PR #{existing['number']}: {existing['html_url']} ({elapsed * 1000:.0f} ms)"
+
+def create_pr(title, description, pat, log_cursor, request: gr.Request = None):
+    session_state(request).log.add_secret(pat)
+    yield from stream_job("network", _create_pr_job, (title, description, pat, request), log_cursor, 1, request)
+
+def _pending_tree(request):
+    """The tree the session's handlers would use, without leasing a worktree for it."""
+    if not (CLONE_PATH / ".git").exists():
+        return None
+    if request is None:
+        return CLONE_PATH
+    return WORKTREES.current(request.session_hash)
+
+def _change_label(code):
+    if code == "??":
+        return "new"
+    code = code.replace(".", "")
+    return {"A": "added", "D": "deleted", "M": "modified", "T": "type changed"}.get(code[-1:], code)
+
+@traced
+def pending_changes(request: gr.Request = None):
+    """Changed files under content/ and data/; sends nothing if they are unchanged since the last call."""
+    state = session_state(request)
+    root = _pending_tree(request)
+    if root is None:
+        changes, key = {}, ()
+    else:
+        watcher = change_watcher(root)
+        changes = watcher.changes()
+        key = (str(root), watcher.generation)
+    if key and key == state.changes_shown:
+        return gr.update(), gr.update()
+    state.changes_shown = key
+    if not changes:
+        return "No pending changes.", gr.update(choices=[], value=None)
+    paths = sorted(changes)
+    lines = [f"**{len(paths)} changed file(s)**", "", "| Status | File |", "|---|---|"]
+    lines += [f"| {_change_label(changes[p])} | `{p}` |" for p in paths[:PENDING_CHANGES_LIMIT]]
+    if len(paths) > PENDING_CHANGES_LIMIT:
+        lines.append(f"| … | {len(paths) - PENDING_CHANGES_LIMIT} more |")
+    return "\n".join(lines), gr.update(choices=paths[:PENDING_CHANGES_LIMIT])
+
+@traced
+def file_diff(path, request: gr.Request = None):
+    root = _pending_tree(request)
+    if not path or root is None:
+        return ""
+    return change_watcher(root).diff(path)
+
+# --- Page Load ---
+_page_load_cache = {"key": None, "outputs": None}
+
+def page_load(workspace="", request: gr.Request = None):
+    """Initial values for every new page; recomputed only when authors or settings change.
 
-def create_pr(title):
-    return f"Dummy PR '{title}' created"
+    `workspace` is kept in the browser's localStorage, so a reloaded tab gets
+    back the worktree (and with it the branch and article) it had before.
+    """
+    started = time.perf_counter()
+    workspace = workspace or uuid.uuid4().hex
+    if request is not None:
+        state = session_state(request)
+        state.workspace = workspace
+        root = WORKTREES.claim(request.session_hash, workspace) if (CLONE_PATH / ".git").exists() else None
+        if root is not None:
+            restore_session(state, root)
+            state.log.write(f"Reopened your worktree on branch '{state.branch or 'detached'}'")
+    AUTHORS.refresh()
+    key = (AUTHORS.generation, STATE.version)
+    hit = _page_load_cache["key"] == key
+    if not hit:
+        # Load authors
+        status, dd1, dd2 = refresh_authors("espressif")
+        
+        # Settings were loaded from .env once at startup; they belong to the user of a single-user instance
+        pat = STATE.get_setting('GITHUB_PAT') if STATE.single_user else None
+        email = STATE.get_setting('USER_EMAIL') if STATE.single_user else None
+        
+        git_msg = ""
+        if pat:
+            git_msg += "✅ Found GITHUB_PAT in .env\n"
+        if email:
+            git_msg += "✅ Found USER_EMAIL in .env\n"
+        
+        _page_load_cache["key"] = key
+        _page_load_cache["outputs"] = (status, dd1, dd2, gr.update(value=pat or ""), gr.update(value=email or ""), gr.update(value=git_msg))
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    session_state(request).log.write(f"Page load took {elapsed_ms:.1f} ms (cache {'hit' if hit else 'miss'})", "DEBUG")
+    return _page_load_cache["outputs"] + (workspace,)
 
 # --- Gradio UI ---
-with gr.Blocks(title="Developer portal article manager", css="""
-    .vscode-link-container {
-        margin: 10px 0;
-        padding: 12px 20px;
-        background: linear-gradient(135deg, #f56565 0%, #c53030 100%);
-        border-radius: 8px;
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-        border: 2px solid #742a2a;
-    }
-    .vscode-link {
-        color: white !important;
-        text-decoration: none !important;
-        font-weight: bold !important;
-        font-size: 16px !important;
-        display: flex !important;
-        align-items: center !important;
-        gap: 8px !important;
-    }
-    .vscode-link:hover {
-        color: #fed7d7 !important;
-        text-decoration: underline !important;
-    }
-    .preview-link-container {
-        margin: 10px 0;
-        padding: 12px 20px;
-        background: linear-gradient(135deg, #ed8936 0%, #dd6b20 100%);
-        border-radius: 8px;
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-        border: 2px solid #c05621;
-    }
-    .preview-link {
-        color: white !important;
-        text-decoration: none !important;
-        font-weight: bold !important;
-        font-weight: bold !important;
-        font-size: 16px !important;
-        display: flex !important;
-        align-items: center !important;
-        gap: 8px !important;
-    }
-    .preview-link:hover {
-        color: #feebc8 !important;
-        text-decoration: underline !important;
-    }
-""") as demo:
-    terminal_state = gr.State("")
-    with gr.Accordion("Logs"):
-        # Status outputs
-        author_status = gr.Markdown()
-        article_output = gr.Markdown()
-        git_output = gr.Markdown()
-    with gr.Row():
-        vscode_link_output = gr.HTML()
-        preview_link_output = gr.HTML()
-    with gr.Tabs():
-        with gr.TabItem("Git Credentials"):
-            with gr.Row():
-                pat_tb = gr.Textbox(label="GitHub PAT", type="password")
-                email_tb = gr.Textbox(label="Commit Email", placeholder="user@example.com")
-            with gr.Row(): 
-                repo_display_tb = gr.Textbox(label="Detected Repo Name", interactive=False)
-                username_tb = gr.Textbox(label="Detected Username", interactive=False)
-            with gr.Row():
-                gr.Button("🔍 Check Git").click(check_git_credentials, [pat_tb, email_tb, terminal_state], [git_output, repo_display_tb, username_tb, terminal_state])
-                gr.Button("🍴 Fork Developer Portal", interactive=False).click(fork_repo, [pat_tb], [git_output])
+# Passed to mount_gradio_app: Gradio 6 ignores Blocks(css=...) when the app is mounted
+UI_CSS = """
+.vscode-link-container {
+    margin: 10px 0;
+    padding: 12px 20px;
+    background: linear-gradient(135deg, #f56565 0%, #c53030 100%);
+    border-radius: 8px;
+    box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+    border: 2px solid #742a2a;
+}
+.vscode-link {
+    color: white !important;
+    text-decoration: none !important;
+    font-weight: bold !important;
+    font-size: 16px !important;
+    display: flex !important;
+    align-items: center !important;
+    gap: 8px !important;
+}
+.vscode-link:hover {
+    color: #fed7d7 !important;
+    text-decoration: underline !important;
+}
+.preview-link-container {
+    margin: 10px 0;
+    padding: 12px 20px;
+    background: linear-gradient(135deg, #ed8936 0%, #dd6b20 100%);
+    border-radius: 8px;
+    box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+    border: 2px solid #c05621;
+}
+.preview-link {
+    color: white !important;
+    text-decoration: none !important;
+    font-weight: bold !important;
+    font-weight: bold !important;
+    font-size: 16px !important;
+    display: flex !important;
+    align-items: center !important;
+    gap: 8px !important;
+}
+.preview-link:hover {
+    color: #feebc8 !important;
+    text-decoration: underline !important;
+}
+.log-delta {
+    display: none !important;
+}
+"""
+
+def build_ui():
+    with gr.Blocks(title="Developer portal article manager") as demo:
+        log_cursor_state = gr.State(0)
+        workspace_state = gr.BrowserState("", storage_key="hugo-blog-manager-workspace")
+        with gr.Accordion("Logs"):
+            # Status outputs
+            author_status = gr.Markdown()
+            article_output = gr.Markdown()
+            git_output = gr.Markdown()
+            with gr.Accordion("Session log", open=False):
+                log_level_dd = gr.Dropdown(label="Level", choices=list(LOG_LEVELS), value="INFO")
+                gr.HTML('<pre id="session-log" style="max-height: 300px; overflow-y: auto; white-space: pre-wrap;"></pre>')
+                # Carries only new lines; appended to #session-log in the browser
+                log_delta = gr.Textbox(elem_classes=["log-delta"], container=False)
+        with gr.Row():
+            vscode_link_output = gr.HTML()
+            preview_link_output = gr.HTML()
+        with gr.Tabs():
+            with gr.TabItem("Git Credentials"):
+                with gr.Row():
+                    pat_tb = gr.Textbox(label="GitHub PAT", type="password")
+                    email_tb = gr.Textbox(label="Commit Email", placeholder="user@example.com")
+                with gr.Row(): 
+                    repo_display_tb = gr.Textbox(label="Detected Repo Name", interactive=False)
+                    username_tb = gr.Textbox(label="Detected Username", interactive=False)
+                with gr.Row():
+                    gr.Button("🔍 Check Git").click(check_git_credentials, [pat_tb, email_tb, log_cursor_state], [git_output, repo_display_tb, username_tb, log_cursor_state, log_delta])
+                    gr.Button("🍴 Fork Developer Portal", interactive=False).click(fork_repo, [pat_tb], [git_output])
         
-        with gr.TabItem("Author"):
-            author_choice = gr.Radio(
-                label="Author Option",
-                choices=["Use existing author", "Create new author"],
-                value="Use existing author"
-            )
-            # Existing Author Section
-            with gr.Accordion("Existing Author", open=True, visible=True) as existing_accordion:
-                existing_author_dd = gr.Dropdown(label="Select Author", choices=[], interactive=True)
+            with gr.TabItem("Author"):
+                author_choice = gr.Radio(
+                    label="Author Option",
+                    choices=["Use existing author", "Create new author"],
+                    value="Use existing author"
+                )
+                # Existing Author Section
+                with gr.Accordion("Existing Author", open=True, visible=True) as existing_accordion:
+                    existing_author_dd = gr.Dropdown(label="Select Author", choices=[], interactive=True, allow_custom_value=True)
+                author_articles_md = gr.Markdown()
             
-            # New Author Section
-            with gr.Accordion("New Author", open=False, visible=False) as new_accordion:
-                with gr.Row():
-                    with gr.Column(scale=2):
-                        new_author_tb = gr.Textbox(label="New Author Name", placeholder="New author...")
-                        create_author_btn = gr.Button("➕ Create Author", variant="primary")
+                # New Author Section
+                with gr.Accordion("New Author", open=False, visible=False) as new_accordion:
+                    with gr.Row():
+                        with gr.Column(scale=2):
+                            new_author_tb = gr.Textbox(label="New Author Name", placeholder="New author...")
+                            new_author_image = gr.File(label="Author Image (optional)", file_types=["image"], type="filepath")
+                            create_author_btn = gr.Button("➕ Create Author", variant="primary")
         
-        with gr.TabItem("Article"):
-            # Article Section
-            article_title_tb = gr.Textbox(label="Article Title", placeholder="My first post...")
-            create_article_btn = gr.Button("📝 Create Article", variant="stop")
+            with gr.TabItem("Article"):
+                # Article Section
+                article_title_tb = gr.Textbox(label="Article Title", placeholder="My first post...")
+                with gr.Row():
+                    create_article_btn = gr.Button("📝 Create Article", variant="stop")
+                    prepare_preview_btn = gr.Button("🖥️ Prepare Preview")
+                    hugo_build_btn = gr.Button("🏗️ Full Hugo Build")
 
         
-        with gr.TabItem("Edit Operations"):
+            with gr.TabItem("Bulk Import"):
+                manifest_file = gr.File(label="Manifest (YAML or CSV)", file_types=[".yaml", ".yml", ".csv"])
+                import_mode = gr.Radio(label="Commit Mode", choices=["Single commit", "One branch per article"], value="Single commit")
+                import_btn = gr.Button("📦 Import Manifest", variant="primary")
+
+            with gr.TabItem("Edit Operations"):
             
-            branch_tb = gr.Textbox(label="Branch", placeholder="feature/blog", interactive=False)
-            msg_tb = gr.Textbox(label="Commit Msg", value="Add authors/articles")
-            with gr.Row():
-                gr.Button("💾 Commit").click(commit_changes, [msg_tb, pat_tb, terminal_state], [git_output, terminal_state])
-                gr.Button("⬆️ Push", variant="stop", interactive=False).click(push_changes, [branch_tb, pat_tb, msg_tb, terminal_state], [git_output, terminal_state])
+                branch_tb = gr.Textbox(label="Branch", placeholder="feature/blog", interactive=False)
+                msg_tb = gr.Textbox(label="Commit Msg", value="Add authors/articles")
+                with gr.Row():
+                    gr.Button("💾 Commit").click(commit_changes, [msg_tb, pat_tb, log_cursor_state], [git_output, log_cursor_state, log_delta])
+                    gr.Button("⬆️ Push", variant="stop").click(push_changes, [branch_tb, pat_tb, msg_tb, log_cursor_state], [git_output, log_cursor_state, log_delta])
+                    gr.Button("⏹ Cancel").click(cancel_jobs, None, [git_output])
+                with gr.Accordion("Pending changes", open=True):
+                    pending_md = gr.Markdown("No pending changes.")
+                    pending_file_dd = gr.Dropdown(label="Show diff for", choices=[], interactive=True)
+                    pending_diff = gr.Code(label="Diff", language=None, interactive=False)
+                pending_timer = gr.Timer(PENDING_CHANGES_POLL)
+                pending_timer.tick(pending_changes, None, [pending_md, pending_file_dd], show_progress="hidden")
+                pending_file_dd.change(file_diff, [pending_file_dd], [pending_diff], show_progress="hidden")
         
-        with gr.TabItem("Publishing Operations"):
-            pr_title_tb = gr.Textbox(label="Pull Request Title", placeholder="Enter PR title...")
-            pr_descripton_tb=gr.Textbox(label="Description", lines=10, max_lines=20)  # Scrollable textarea
-            gr.Button("🔀 Create Pull Request", variant="primary", interactive=False).click(create_pr, inputs=[pr_title_tb], outputs=[git_output])
+            with gr.TabItem("Publishing Operations"):
+                pr_title_tb = gr.Textbox(label="Pull Request Title", placeholder="Enter PR title...")
+                pr_descripton_tb=gr.Textbox(label="Description", lines=10, max_lines=20, placeholder="Leave empty to list the articles and commits on your branch")  # Scrollable textarea
+                gr.Button("🔀 Create Pull Request", variant="primary").click(create_pr, [pr_title_tb, pr_descripton_tb, pat_tb, log_cursor_state], [git_output, log_cursor_state, log_delta])
     
 
         
     
 
-    # Connect buttons to functions
-    create_author_btn.click(
-        create_author,
-        inputs=[new_author_tb],
-        outputs=[author_status, existing_author_dd, existing_author_dd]
-    )
+        # Connect buttons to functions
+        create_author_btn.click(
+            create_author,
+            inputs=[new_author_tb, new_author_image],
+            outputs=[author_status, existing_author_dd, existing_author_dd]
+        )
     
-    # refresh_btn.click(
-    #     refresh_authors,
-    #     inputs=None,
-    #     outputs=[author_status, existing_author_dd, existing_author_dd]
-    # )
+        existing_author_dd.change(author_articles, [existing_author_dd], [author_articles_md], show_progress="hidden")
+
+        existing_author_dd.key_up(
+            search_authors,
+            inputs=None,
+            outputs=[existing_author_dd],
+            trigger_mode="always_last",
+            show_progress="hidden"
+        )
+
+        # refresh_btn.click(
+        #     refresh_authors,
+        #     inputs=None,
+        #     outputs=[author_status, existing_author_dd, existing_author_dd]
+        # )
     
-    create_article_btn.click(
-        create_article, 
-        inputs=[article_title_tb, existing_author_dd, pat_tb, email_tb, terminal_state], 
-        outputs=[article_output, branch_tb, vscode_link_output, preview_link_output, terminal_state]
-    )
+        import_btn.click(
+            bulk_import,
+            inputs=[manifest_file, import_mode, pat_tb, email_tb, log_cursor_state],
+            outputs=[article_output, log_cursor_state, log_delta]
+        )
 
-    def startup():
-        # Load authors
-        status, dd1, dd2 = refresh_authors("espressif")
-        
-        # Load .env
-        load_dotenv(override=True)
-        pat = os.getenv('GITHUB_PAT')
-        email = os.getenv('USER_EMAIL')
-        
-        git_msg = ""
-        if pat:
-            git_msg += "✅ Found GITHUB_PAT in .env\n"
-        if email:
-            git_msg += "✅ Found USER_EMAIL in .env\n"
-        
-        return status, dd1, dd2, gr.update(value=pat or ""), gr.update(value=email or ""), gr.update(value=git_msg)
-
-    # ✅ Populate dropdown at startup
-    demo.load(
-        startup,
-        inputs=[],
-        outputs=[author_status, existing_author_dd, existing_author_dd, pat_tb, email_tb, git_output]
-    )
-
-    def toggle_accordions(choice):
-        if choice == "Use existing author":
-            return gr.update(visible=True), gr.update(visible=False)
-        else:
-            return gr.update(visible=False), gr.update(visible=True)
+        create_article_btn.click(
+            create_article, 
+            inputs=[article_title_tb, existing_author_dd, pat_tb, email_tb, log_cursor_state], 
+            outputs=[article_output, branch_tb, vscode_link_output, preview_link_output, log_cursor_state, log_delta]
+        )
+
+        prepare_preview_btn.click(prepare_preview, [log_cursor_state], [article_output, log_cursor_state, log_delta])
+        hugo_build_btn.click(hugo_build, [log_cursor_state], [article_output, log_cursor_state, log_delta])
+
+        # ✅ Populate dropdown at startup
+        demo.load(
+            page_load,
+            inputs=[workspace_state],
+            outputs=[author_status, existing_author_dd, existing_author_dd, pat_tb, email_tb, git_output, workspace_state]
+        )
+
+        def toggle_accordions(choice):
+            if choice == "Use existing author":
+                return gr.update(visible=True), gr.update(visible=False)
+            else:
+                return gr.update(visible=False), gr.update(visible=True)
+
+        log_level_dd.change(set_log_level, [log_level_dd], [log_cursor_state, log_delta])
+        log_delta.change(None, [log_delta], None, js=f"""(payload) => {{
+            if (!payload) return;
+            const delta = JSON.parse(payload);
+            const el = document.getElementById("session-log");
+            const lines = (delta.reset ? [] : el.textContent.split("\\n").filter(Boolean)).concat(delta.lines);
+            el.textContent = lines.slice(-{LOG_BUFFER_LINES}).join("\\n");
+            el.scrollTop = el.scrollHeight;
+        }}""")
+
+        author_choice.change(
+            toggle_accordions,
+            inputs=[author_choice],
+            outputs=[existing_accordion, new_accordion]
+        )
+
+        def release_session(request: gr.Request):
+            WORKTREES.forget(request.session_hash)
+            STATE.drop(request.session_hash)
+
+        # Hand the session's worktree back to the pool when the browser tab closes
+        # and forget its in-memory state; a parked worktree waits for the workspace to come back
+        demo.unload(release_session)
+    return demo
+
+def register_gauges():
+    def rate_limit():
+        with _github_clients_lock:
+            values = [c.rate_limit_remaining for c in _github_clients.values() if c.rate_limit_remaining is not None]
+        return {(): min(values)} if values else {}
+
+    METRICS.gauge("github_rate_limit_remaining", rate_limit, "Lowest remaining GitHub rate limit across PATs")
+    METRICS.gauge("worktrees", lambda: {(("state", k),): v for k, v in WORKTREES.stats().items()},
+                  "Worktrees by state")
+    METRICS.gauge("push_queue_depth", lambda: {(("state", k),): v for k, v in PUSHES.depth().items()},
+                  "Queued and running branch pushes")
+    METRICS.gauge("job_queue_depth", lambda: {(("kind", k),): v for k, v in JOBS.depth().items()},
+                  "Queued plus running jobs")
+
+def build_app(demo):
+    """FastAPI app serving /metrics, /traces and article previews next to the Gradio UI."""
+    import asyncio
+    from fastapi import FastAPI, HTTPException
+    from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, PlainTextResponse, StreamingResponse
+
+    app = FastAPI()
+
+    @app.get("/metrics")
+    def metrics():
+        return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
+    @app.get("/traces")
+    def traces():
+        return JSONResponse(list(_slow_traces))
+
+    @app.get("/preview/{token}/")
+    def preview(token: str):
+        try:
+            digest, body = PREVIEWS.render(token)
+        except (KeyError, OSError):
+            raise HTTPException(404, "No such article")
+        nonce = uuid.uuid4().hex
+        return HTMLResponse(preview_page(token, digest, body, nonce),
+                            headers={"Content-Security-Policy": PREVIEW_CSP.format(nonce=nonce)})
+
+    @app.get("/preview/{token}/{name:path}")
+    def preview_file(token: str, name: str):
+        """Page bundle resources (images) referenced from the article."""
+        return _bundle_file(PREVIEWS.article(token), name, BUNDLE_CSP)
+
+    @app.get("/preview-events/{token}")
+    async def preview_events(token: str, since: str = ""):
+        async def events():
+            last = since
+            while True:
+                try:
+                    # Rendering reads the file and runs the Markdown parser; keep it off the event loop
+                    digest, body = await asyncio.to_thread(PREVIEWS.render, token)
+                except (KeyError, OSError):
+                    yield "event: gone\ndata: {}\n\n"
+                    return
+                if digest != last:
+                    last = digest
+                    yield f"data: {json.dumps({'html': body})}\n\n"
+                await asyncio.sleep(PREVIEW_POLL_SECONDS)
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/hugo/{site}/{name:path}")
+    def hugo_site(site: str, name: str):
+        if PREVIEWS.site(site) is None:
+            raise HTTPException(404, "No such build")
+        return _bundle_file(PREVIEW_BUILD_ROOT / site, name, HUGO_CSP)
+
+    def _bundle_file(root, name, csp):
+        if root is None:
+            raise HTTPException(404)
+        path = (root / name).resolve()
+        if path.is_dir():
+            path = path / "index.html"
+        if not path.is_relative_to(root.resolve()) or not path.is_file():
+            raise HTTPException(404)
+        return FileResponse(path, headers={"Content-Security-Policy": csp, "X-Content-Type-Options": "nosniff"})
+
+    return gr.mount_gradio_app(app, demo, path="/", css=UI_CSS)
+
+def main():
+    ui_started = time.perf_counter()
+    import_ms = (ui_started - _IMPORT_STARTED) * 1000
+    STATE.load()
+    demo = build_ui()
+    print(f"Startup: module import {import_ms:.0f} ms, settings + UI build {(time.perf_counter() - ui_started) * 1000:.0f} ms")
+
+    if (CLONE_PATH / ".git").exists():
+        threading.Thread(target=WORKTREES.warm, daemon=True).start()
+        threading.Thread(target=CONTENT_INDEX.update, daemon=True).start()
+        threading.Thread(target=warm_submodule_cache, daemon=True).start()
+    threading.Thread(target=_evict_idle_worktrees, daemon=True).start()
+    threading.Thread(target=_gc_submodule_cache, daemon=True).start()
+
+    register_gauges()
+    demo.queue(default_concurrency_limit=UI_CONCURRENCY)
+    import uvicorn
+    uvicorn.run(build_app(demo), host="0.0.0.0", port=7860)
 
-    author_choice.change(
-        toggle_accordions,
-        inputs=[author_choice],
-        outputs=[existing_accordion, new_accordion]
-    )
 
-demo.launch(server_name="0.0.0.0", server_port=7860, debug=True)
+if __name__ == "__main__":
+    main()